@@ -1,18 +1,50 @@
+import csv
 import math
-import clr
-clr.AddReference('RevitAPIUI')
+from functools import lru_cache
 
-from Autodesk.Revit.UI import TaskDialog
+try:
+    import numpy as np
+except ImportError: # NumPy is only needed for the array calculations
+    np = None
 
 WALL_PRESSURE = 0.8
 WALL_SUCTION = -0.5
 MONOPITCH_SUCTION_US = -0.6
 MONOPITCH_SUCTION_DS = -0.9
+PRESSURE_SURFACES = [ # Names of the pressure surfaces of calculate_pressure_coefficents
+    "Wall pressure",
+    "Wall suction",
+    "Roof pressure",
+    "Double-pitch roof suction",
+    "Mono-pitch roof suction to up slope",
+    "Mono-pitch roof suction to down slope"
+]
 TERRAIN_CATEGORY_ROME = ["0", "I", "II", "III", "IV"]
 Z_ZERO = [0.003, 0.01, 0.05, 0.3, 1] # List of roughness lengths z0 depended from TC
 Z_MIN = [1, 1, 2, 5, 10] # List of zmin's depended from TC
 TERRAIN_FACTOR_FIN = 0.18
-
+TERRAIN_FACTORS = [0.19 * (z_zero / Z_ZERO[2]) ** 0.07 for z_zero in Z_ZERO] # List of terrain factors kr depended from TC
+CPROB_CACHE_SIZE = 256 # Probability factors cached by return period and parameters
+HEIGHT_GRID_STEP = 0.5 # in meters. Heights on this grid use precomputed ln(z/z0) tables.
+DESIGN_TABLE_HEIGHTS = list(range(5, 105, 5)) # in meters
+DESIGN_TABLE_RETURN_PERIODS = [2, 5, 10, 50] # in years
+DESIGN_TABLE_BAY_LENGTHS = [1572, 2072, 2572, 3072] # Standard bay lengths in millimeters
+DESIGN_TABLE_DECIMALS = 4 # Decimals of the calculated values in design table CSV
+BATCH_CHUNK_SIZE = 10000 # Site rows calculated at once in batch mode
+SITE_COLUMNS = { # Site CSV columns and their defaults. Columns without default are required.
+    "Finnish NA": False,
+    "Fundamental basic wind velocity": None,
+    "Terrain category": None,
+    "Return period": 50,
+    "Seasonal factor": 1.0,
+    "Orography factor": 1.0,
+    "Height": None,
+    "Roof width": 0,
+    "Bay length": None,
+    "Roof angle": 0
+}
+
+@lru_cache(maxsize=CPROB_CACHE_SIZE)
 def calculate_propability_factor(return_period: int, shape_parameter: float=0.2, cprob_exponent: float=0.5) -> float:
     """Probability factor is used to modify fundamental basic wind velocity vb which has mean return period
         of 50 years. The 10 minutes mean wind velocity having the probability p for an annual exceedence is determined
@@ -26,6 +58,7 @@ def calculate_propability_factor(return_period: int, shape_parameter: float=0.2,
         p is probability for an annual exceedence
 
         NOTE: Return period has been limited to min 2 years, due value 1 or less will lead into error -> ln(0)
+        NOTE: Results are cached, since the same return periods are calculated repeatedly.
 
     Args:
         return_period (int): Return period in years to calculate probability for an annual exceedence.
@@ -66,7 +99,128 @@ def calculate_terrain_factor(fin: bool, terrain_category: int) -> float:
 
     if fin and terrain_category == 0:
         return TERRAIN_FACTOR_FIN
-    return 0.19 * (Z_ZERO[terrain_category]/Z_ZERO[2]) ** 0.07
+    return TERRAIN_FACTORS[terrain_category]
+
+def calculate_propability_factor_array(return_period, shape_parameter: float=0.2, cprob_exponent: float=0.5):
+    """Calculate probability factors for an array of return periods with NumPy.
+        Uses the same expression as calculate_propability_factor.
+
+    Args:
+        return_period (float): Return periods in years. Limited to min 2 years.
+        shape_parameter (float, optional): Parameter depending on the coefficient of variation of the extreme-value distribution. Defaults to 0.2.
+        cprob_exponent (float, optional): Exponent of the expression. Defaults to 0.5.
+
+    Returns:
+        ndarray: Probability factors.
+    """
+
+    return_period = np.maximum(np.asarray(return_period, dtype=float), 2)
+    divident = 1 - shape_parameter * np.log(-1 * np.log(1 - 1 / return_period))
+    divider = 1 - shape_parameter * math.log(-1 * math.log(0.98))
+    return (divident / divider) ** cprob_exponent
+
+def calculate_return_period(cprob, shape_parameter: float=0.2, cprob_exponent: float=0.5):
+    """Inverse of the probability factor expression. Solves the return period corresponding to the probability factor
+        in closed form:
+
+        p = 1 - exp(-exp((1 - cprob^(1/n) ⋅ (1 - K ⋅ ln(-ln(0.98)))) / K))  and  return period = 1 / p
+
+    Args:
+        cprob (float): Probability factors. Single value or array.
+        shape_parameter (float, optional): Parameter depending on the coefficient of variation of the extreme-value distribution. Defaults to 0.2.
+        cprob_exponent (float, optional): Exponent of the expression. Defaults to 0.5.
+
+    Returns:
+        ndarray: Return periods in years. Infinite if the probability factor is never exceeded.
+    """
+
+    divider = 1 - shape_parameter * math.log(-1 * math.log(0.98))
+    with np.errstate(divide="ignore", over="ignore"):
+        probability = -np.expm1(-np.exp((1 - np.asarray(cprob, dtype=float) ** (1 / cprob_exponent) * divider) / shape_parameter))
+        return 1 / probability
+
+def calculate_terrain_factor_array(fin, terrain_category):
+    """Terrain factors for an array of terrain categories with NumPy. Uses the same values as calculate_terrain_factor.
+
+    Args:
+        fin (bool): Boolean determine whether finnish NA should be followed or not.
+        terrain_category (int): Terrain categories. Integers between 0 - 4.
+
+    Returns:
+        ndarray: Terrain factors.
+    """
+
+    terrain_category = np.asarray(terrain_category, dtype=int)
+    return np.where(np.logical_and(fin, terrain_category == 0), TERRAIN_FACTOR_FIN, np.asarray(TERRAIN_FACTORS)[terrain_category])
+
+@lru_cache(maxsize=len(Z_ZERO))
+def get_log_height_table(terrain_category: int) -> tuple:
+    """Precompute ln(z/z0) of the terrain category for every height of the height grid from 0 to 200 meters.
+        Heights below zmin are limited to zmin as in the wind calculations.
+
+    Args:
+        terrain_category (int): Terrain category used in a calculation. Integer between 0 - 4.
+
+    Returns:
+        tuple: ln(z/z0) values. Index = height / HEIGHT_GRID_STEP.
+    """
+
+    count = round(200 / HEIGHT_GRID_STEP) + 1
+    return tuple(
+        math.log(max(number * HEIGHT_GRID_STEP, Z_MIN[terrain_category]) / Z_ZERO[terrain_category])
+        for number in range(count)
+    )
+
+def calculate_log_height(terrain_category: int, wind_height: float) -> float:
+    """Calculate ln(z/z0). Heights on the height grid are read from the precomputed table,
+        other heights are calculated.
+
+    Args:
+        terrain_category (int): Terrain category used in a calculation. Integer between 0 - 4.
+        wind_height (float): Height limited between zmin and 200 meters.
+
+    Returns:
+        float: ln(z/z0)
+    """
+
+    index = wind_height / HEIGHT_GRID_STEP
+    if index == int(index):
+        return get_log_height_table(terrain_category)[int(index)]
+    return math.log(wind_height / Z_ZERO[terrain_category])
+
+@lru_cache(maxsize=1)
+def get_log_height_array_table():
+    """Combine ln(z/z0) tables of all terrain categories into one NumPy array.
+
+    Returns:
+        ndarray: ln(z/z0) values. Row = terrain category. Column = height / HEIGHT_GRID_STEP.
+    """
+
+    return np.array([get_log_height_table(terrain_category) for terrain_category in range(len(Z_ZERO))])
+
+def calculate_log_height_array(terrain_category, wind_height):
+    """Calculate ln(z/z0) for arrays of terrain categories and heights with NumPy. Heights on the height grid
+        are read from the precomputed tables, so they equal the results of calculate_log_height.
+
+    Args:
+        terrain_category (int): Array of terrain categories.
+        wind_height (float): Array of heights limited between zmin and 200 meters.
+
+    Returns:
+        ndarray: ln(z/z0) values.
+    """
+
+    terrain_category, wind_height = np.broadcast_arrays(terrain_category, wind_height)
+    index = wind_height / HEIGHT_GRID_STEP
+    on_grid = index == np.floor(index)
+    log_tables = get_log_height_array_table()
+    if on_grid.all():
+        return log_tables[terrain_category, index.astype(int)]
+    log_height = np.empty(wind_height.shape)
+    log_height[on_grid] = log_tables[terrain_category[on_grid], index[on_grid].astype(int)]
+    off_grid = ~on_grid
+    log_height[off_grid] = np.log(wind_height[off_grid] / np.asarray(Z_ZERO)[terrain_category[off_grid]])
+    return log_height
 
 def convert_pressure_to_speed(pressure: float, air_density: float) -> float:
     """Converts wind pressure to wind speed using the expression qp = 0.5 ⋅ p ⋅ (vb)^2 which
@@ -130,9 +284,10 @@ def calculate_peak_velocity_pressure(
     cprob = calculate_propability_factor(return_period)
     basic_wind_velocity = fundamental_basic_wind_velocity * cprob * seasonal_factor * directional_factor
     terrain_factor = calculate_terrain_factor(fin, terrain_category)
-    roughness_factor = terrain_factor * math.log(wind_height / Z_ZERO[terrain_category])
+    log_height = calculate_log_height(terrain_category, wind_height)
+    roughness_factor = terrain_factor * log_height
     mean_wind_velocity = roughness_factor * orography_factor * basic_wind_velocity
-    wind_turbulence = turbulence_factor / (orography_factor * math.log(wind_height / Z_ZERO[terrain_category]))
+    wind_turbulence = turbulence_factor / (orography_factor * log_height)
     peak_velocity_pressure = (1 + 7 * wind_turbulence) * 1/2000 * air_density * mean_wind_velocity ** 2
     peak_wind_speed = convert_pressure_to_speed(peak_velocity_pressure, air_density)
 
@@ -154,6 +309,141 @@ def calculate_peak_velocity_pressure(
         peak_wind_speed
     ]
 
+def calculate_lift_heights(height: float, lift_spacing: float) -> list:
+    """Heights of the lifts from the first lift up to the total height. The total height is included as
+        the last lift even if it is not a multiple of the lift spacing.
+
+    Args:
+        height (float): Total structure height from the ground in meters.
+        lift_spacing (float): Height between lifts in meters.
+
+    Returns:
+        list: Lift heights in meters.
+    """
+
+    count = math.floor(height / lift_spacing + 1e-9)
+    lift_heights = [lift_spacing * number for number in range(1, count + 1)]
+    if len(lift_heights) == 0 or lift_heights[-1] < height - 1e-9:
+        lift_heights.append(height)
+    return lift_heights
+
+def calculate_peak_velocity_pressure_profile(
+    fin: bool,
+    terrain_category: int,
+    return_period: float,
+    heights: list,
+    fundamental_basic_wind_velocity: float,
+    seasonal_factor: float=1.0,
+    orography_factor: float=1.0,
+    air_density: float=1.25,
+    directional_factor: float=1.0,
+    turbulence_factor: float=1.0
+) -> dict:
+    """Calculate peak velocity pressure for a vector of heights in one NumPy pass. Uses the same
+        expressions as calculate_peak_velocity_pressure, so each element equals the scalar result for that height.
+
+    Args:
+        fin (bool): To determine whether finnish NA needs to be used or not.
+        terrain_category (int): Value between 0 - 4 to determine roughness and turbulence factors.
+        return_period (float): Return period in years to calculate probability for an annual exceedence.
+        heights (list): Heights from the ground in meters, e.g. from calculate_lift_heights.
+        fundamental_basic_wind_velocity (float): is the fundamental value of the basic wind velocity in m/s.
+        seasonal_factor (float, optional): The value of seasonal factor. May be given in the NA. Defaults to 1.0.
+        orography_factor (float, optional): Orography factor, taken as 1,0 unless otherwise specified in 4.3.3. Defaults to 1.0.
+        air_density (float, optional): Air density depends on the altitude, temperature and barometric pressure. Defaults to 1.25.
+        directional_factor (float, optional): The value of directional factor. May be given in the NA. Defaults to 1.0.
+        turbulence_factor (float, optional): The value of the turbulence factor. May be given in the NA. Defaults to 1.0.
+
+    Returns:
+        dict: Arrays of heights, mean wind velocity vm(z), turbulence intensity Iv(z) and peak velocity pressure qp(z).
+    """
+
+    profile = calculate_peak_velocity_pressure_array(
+        fin,
+        terrain_category,
+        return_period,
+        heights,
+        fundamental_basic_wind_velocity,
+        seasonal_factor,
+        orography_factor,
+        air_density,
+        directional_factor,
+        turbulence_factor
+    )
+    profile["Height"] = np.asarray(heights, dtype=float)
+    return profile
+
+def calculate_peak_velocity_pressure_array(
+    fin,
+    terrain_category,
+    return_period,
+    height,
+    fundamental_basic_wind_velocity,
+    seasonal_factor=1.0,
+    orography_factor=1.0,
+    air_density=1.25,
+    directional_factor=1.0,
+    turbulence_factor=1.0
+) -> dict:
+    """Calculate peak velocity pressure for arrays of site parameters with NumPy. All arguments can be single values
+        or arrays, which are broadcast together, e.g. one row per site. Uses the same expressions as calculate_peak_velocity_pressure.
+
+    Args:
+        fin (bool): To determine whether finnish NA needs to be used or not.
+        terrain_category (int): Values between 0 - 4 to determine roughness and turbulence factors.
+        return_period (float): Return periods in years. Limited to min 2 years.
+        height (float): Heights from the ground in meters.
+        fundamental_basic_wind_velocity (float): Fundamental values of the basic wind velocity in m/s.
+        seasonal_factor (float, optional): The value of seasonal factor. Defaults to 1.0.
+        orography_factor (float, optional): Orography factor. Defaults to 1.0.
+        air_density (float, optional): Air density. Defaults to 1.25.
+        directional_factor (float, optional): The value of directional factor. Defaults to 1.0.
+        turbulence_factor (float, optional): The value of the turbulence factor. Defaults to 1.0.
+
+    Returns:
+        dict: Key = name of the calculation parameter as in format_input. Value = array of results.
+    """
+
+    if np is None:
+        raise ImportError("NumPy is required for array calculations")
+
+    terrain_category = np.asarray(terrain_category, dtype=int)
+    wind_height = np.maximum(np.minimum(200, np.asarray(height, dtype=float)), np.asarray(Z_MIN)[terrain_category])
+    cprob = calculate_propability_factor_array(return_period)
+    basic_wind_velocity = fundamental_basic_wind_velocity * cprob * seasonal_factor * directional_factor
+    terrain_factor = calculate_terrain_factor_array(fin, terrain_category)
+    log_height = calculate_log_height_array(terrain_category, wind_height)
+    roughness_factor = terrain_factor * log_height
+    mean_wind_velocity = roughness_factor * orography_factor * basic_wind_velocity
+    wind_turbulence = turbulence_factor / (orography_factor * log_height)
+    peak_velocity_pressure = (1 + 7 * wind_turbulence) * 1/2000 * air_density * mean_wind_velocity ** 2
+
+    return {
+        "Probability factor": cprob,
+        "Basic wind velocity": basic_wind_velocity,
+        "Mean wind velocity": mean_wind_velocity,
+        "Roughness factor": roughness_factor,
+        "Wind turbulence intensity": wind_turbulence,
+        "Peak velocity pressure": peak_velocity_pressure,
+        "Peak wind speed": np.sqrt((1000 * peak_velocity_pressure * 2) / air_density)
+    }
+
+def calculate_line_loads(pressure_coefficients: dict, bay_length: int, peak_velocity_pressure) -> dict:
+    """Calculate line loads p [kN/m] = cp ⋅ bay length [m] ⋅ peak velocity pressure [kN/m2] for every
+        pressure surface. Peak velocity pressure can be a single value or an array, e.g. one value per lift.
+
+    Args:
+        pressure_coefficients (dict): Pressure coefficients in dictionary format. Key = name of the pressure surface. Value = coefficient.
+        bay_length (int): Bay length in millimeters.
+        peak_velocity_pressure (float): Peak velocity pressure in kN/m2.
+
+    Returns:
+        dict: Key = name of the pressure surface. Value = line load in kN/m.
+    """
+
+    line_load = (bay_length / 1000) * peak_velocity_pressure
+    return {key: value * line_load for key, value in pressure_coefficients.items()}
+
 def calculate_roof_suction(angle: int, width: int) -> float:
     """Calculate external roof suction pressure coefficient according to EN 16508
         using roof angle and roof width.
@@ -193,13 +483,382 @@ def calculate_pressure_coefficents(angle: int, width: int) -> dict:
     coefficients["Double-pitch roof suction"] = calculate_roof_suction(angle, width)
     coefficients["Mono-pitch roof suction to up slope"] = MONOPITCH_SUCTION_US
     coefficients["Mono-pitch roof suction to down slope"] = MONOPITCH_SUCTION_DS
-    if roof_width == 0:
+    if width == 0:
         coefficients["Roof pressure"] = 0
         coefficients["Double-pitch roof suction"] = 0
         coefficients["Mono-pitch roof suction to up slope"] = 0
         coefficients["Mono-pitch roof suction to down slope"] = 0      
     return coefficients
 
+def calculate_pressure_coefficents_array(angle, width) -> dict:
+    """Calculate pressure coefficients for arrays of roof angles and roof widths with NumPy.
+        Uses the same rules as calculate_pressure_coefficents.
+
+    Args:
+        angle (int): Roof angles in degrees.
+        width (int): Roof widths in millimeters.
+
+    Returns:
+        dict: Key = name of the pressure surface. Value = array of coefficients.
+    """
+
+    if np is None:
+        raise ImportError("NumPy is required for array calculations")
+
+    angle = np.asarray(angle, dtype=float)
+    width = np.asarray(width, dtype=float)
+    shape = np.broadcast(angle, width).shape
+    has_roof = width != 0
+    angle_factor = np.minimum(np.maximum((angle - 10) / 100, 0), 0.1)
+    roof_suction = np.where(width <= 10000, -0.7, np.where(width < 25000, 0.01 * width / 1000 - 0.8, -0.55)) + angle_factor
+
+    return {
+        "Wall pressure": np.full(shape, WALL_PRESSURE),
+        "Wall suction": np.full(shape, WALL_SUCTION),
+        "Roof pressure": np.where(has_roof, np.minimum(np.maximum(0.03 * angle - 0.25, 0), 0.7), 0),
+        "Double-pitch roof suction": np.where(has_roof, roof_suction, 0),
+        "Mono-pitch roof suction to up slope": np.where(has_roof, MONOPITCH_SUCTION_US, 0),
+        "Mono-pitch roof suction to down slope": np.where(has_roof, MONOPITCH_SUCTION_DS, 0)
+    }
+
+def read_site_chunks(csv_path: str, chunk_size: int=BATCH_CHUNK_SIZE):
+    """Read site parameters from CSV file in chunks, so that large files are never fully loaded in memory.
+        First row is header with column names of SITE_COLUMNS. Missing optional columns get their default values.
+
+    Args:
+        csv_path (str): Path of the site CSV file.
+        chunk_size (int, optional): Count of rows in each chunk. Defaults to BATCH_CHUNK_SIZE.
+
+    Yields:
+        tuple: Original rows of the chunk and dictionary of the site parameters. Key = column name. Value = list of values.
+    """
+
+    with open(csv_path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.DictReader(file)
+        missing = [key for key, default in SITE_COLUMNS.items() if default is None and key not in reader.fieldnames]
+        if missing:
+            raise ValueError(f"Site CSV is missing required columns: {', '.join(missing)}")
+        rows = []
+        for row in reader:
+            rows.append(row)
+            if len(rows) == chunk_size:
+                yield rows, parse_site_rows(rows)
+                rows = []
+        if rows:
+            yield rows, parse_site_rows(rows)
+
+def parse_site_rows(rows: list) -> dict:
+    """Convert site rows into columns of site parameters. Empty cells get the default values of SITE_COLUMNS.
+
+    Args:
+        rows (list): Site rows as dictionaries read from CSV file.
+
+    Returns:
+        dict: Key = column name. Value = list of values.
+    """
+
+    columns = {}
+    for key, default in SITE_COLUMNS.items():
+        values = [(row.get(key) or "").strip() or default for row in rows]
+        if key == "Finnish NA":
+            columns[key] = [str(value).lower() in ("1", "true", "yes", "x") for value in values]
+        else:
+            columns[key] = [float(str(value).replace(",", ".")) for value in values]
+    return columns
+
+def calculate_site_batch(csv_path: str, output_path: str, chunk_size: int=BATCH_CHUNK_SIZE) -> int:
+    """Calculate peak velocity pressure, pressure coefficients and line loads for every site of the CSV file.
+        Sites are calculated in vectorised chunks and results are streamed to the output CSV file
+        after the original site columns. Roof angle is set to zero for sites without roof as in the single site calculation.
+
+    Args:
+        csv_path (str): Path of the site CSV file.
+        output_path (str): Path of the result CSV file.
+        chunk_size (int, optional): Count of sites calculated at once. Defaults to BATCH_CHUNK_SIZE.
+
+    Returns:
+        int: Count of calculated sites.
+    """
+
+    site_count = 0
+    writer = None
+    with open(output_path, "w", newline="", encoding="utf-8") as file:
+        for rows, sites in read_site_chunks(csv_path, chunk_size):
+            roof_width = np.asarray(sites["Roof width"])
+            angle = np.where(roof_width == 0, 0, sites["Roof angle"])
+            results = calculate_peak_velocity_pressure_array(
+                sites["Finnish NA"],
+                sites["Terrain category"],
+                sites["Return period"],
+                sites["Height"],
+                np.asarray(sites["Fundamental basic wind velocity"]),
+                np.asarray(sites["Seasonal factor"]),
+                np.asarray(sites["Orography factor"])
+            )
+            pressure_coefficients = calculate_pressure_coefficents_array(angle, roof_width)
+            line_loads = calculate_line_loads(pressure_coefficients, np.asarray(sites["Bay length"]), results["Peak velocity pressure"])
+            for key, value in pressure_coefficients.items():
+                results[key] = value
+                results[f"{key} load"] = line_loads[key]
+            if writer is None:
+                writer = csv.writer(file)
+                input_columns = list(rows[0].keys())
+                writer.writerow(input_columns + list(results.keys()))
+            result_columns = [values.tolist() for values in results.values()]
+            for number, row in enumerate(rows):
+                writer.writerow([row[key] for key in input_columns] + [values[number] for values in result_columns])
+            site_count += len(rows)
+    return site_count
+
+def calculate_design_table(
+    fin: bool,
+    fundamental_basic_wind_velocity: float,
+    angle: int,
+    roof_width: int,
+    terrain_categories: list=range(len(Z_ZERO)),
+    heights: list=DESIGN_TABLE_HEIGHTS,
+    return_periods: list=DESIGN_TABLE_RETURN_PERIODS,
+    bay_lengths: list=DESIGN_TABLE_BAY_LENGTHS,
+    seasonal_factor: float=1.0,
+    orography_factor: float=1.0
+) -> dict:
+    """Calculate design table of peak velocity pressure and line loads for every combination of terrain category,
+        height, return period and bay length. The full grid is calculated at once by broadcasting the parameters
+        along their own axes and flattened into a tidy table with one row per combination.
+
+    Args:
+        fin (bool): To determine whether finnish NA needs to be used or not.
+        fundamental_basic_wind_velocity (float): is the fundamental value of the basic wind velocity in m/s.
+        angle (int): Roof angle in degrees.
+        roof_width (int): Roof width in millimeters. Roof angle is ignored if roof width is zero.
+        terrain_categories (list, optional): Terrain categories. Defaults to all terrain categories.
+        heights (list, optional): Heights from the ground in meters. Defaults to DESIGN_TABLE_HEIGHTS.
+        return_periods (list, optional): Return periods in years. Defaults to DESIGN_TABLE_RETURN_PERIODS.
+        bay_lengths (list, optional): Bay lengths in millimeters. Defaults to DESIGN_TABLE_BAY_LENGTHS.
+        seasonal_factor (float, optional): The value of seasonal factor. Defaults to 1.0.
+        orography_factor (float, optional): Orography factor. Defaults to 1.0.
+
+    Returns:
+        dict: Key = column name. Value = array of column values, one per combination.
+    """
+
+    if np is None:
+        raise ImportError("NumPy is required for array calculations")
+
+    terrain_categories = np.asarray(terrain_categories, dtype=int)[:, None, None, None]
+    heights = np.asarray(heights, dtype=float)[None, :, None, None]
+    return_periods = np.asarray(return_periods, dtype=float)[None, None, :, None]
+    bay_lengths = np.asarray(bay_lengths, dtype=float)[None, None, None, :]
+    shape = np.broadcast(terrain_categories, heights, return_periods, bay_lengths).shape
+
+    results = calculate_peak_velocity_pressure_array(
+        fin,
+        terrain_categories,
+        return_periods,
+        heights,
+        fundamental_basic_wind_velocity,
+        seasonal_factor,
+        orography_factor
+    )
+    if roof_width == 0:
+        angle = 0
+    pressure_coefficients = calculate_pressure_coefficents(angle, roof_width)
+    line_loads = calculate_line_loads(pressure_coefficients, bay_lengths, results["Peak velocity pressure"])
+
+    table = {
+        "Terrain category": terrain_categories,
+        "Height": heights,
+        "Return period": return_periods,
+        "Bay length": bay_lengths
+    }
+    table.update(results)
+    table.update({f"{key} load": value for key, value in line_loads.items()})
+    return {key: np.broadcast_to(value, shape).ravel() for key, value in table.items()}
+
+def write_design_table(table: dict, output_path: str) -> int:
+    """Write design table into CSV file. First row is header. Grid parameters are written as such and
+        calculated values with DESIGN_TABLE_DECIMALS decimals. Rows are formatted with one format string,
+        since formatting millions of floats one by one is much slower than the calculation itself.
+
+    Args:
+        table (dict): Design table from calculate_design_table.
+        output_path (str): Path of the CSV file.
+
+    Returns:
+        int: Count of written rows.
+    """
+
+    row_format = ",".join(["%d", "%g", "%g", "%g"] + [f"%.{DESIGN_TABLE_DECIMALS}f"] * (len(table) - 4)) + "\n"
+    with open(output_path, "w", newline="", encoding="utf-8") as file:
+        file.write(",".join(table.keys()) + "\n")
+        file.writelines(row_format % row for row in zip(*(values.tolist() for values in table.values())))
+    return len(next(iter(table.values())))
+
+def filter_pressure_coefficients(pressure_coefficients: dict, monopitch: bool) -> dict:
+    """Leave out roof suction coefficients which do not belong to the roof type.
+
+    Args:
+        pressure_coefficients (dict): Pressure coefficients in dictionary format. Key = name of the pressure surface. Value = coefficient.
+        monopitch (bool): Boolen value to determine whether roof type is monopitch (true) or duopitch (false).
+
+    Returns:
+        dict: Pressure coefficients of the roof type.
+    """
+
+    filtered_coefficients = pressure_coefficients.copy()
+    if (monopitch):
+        filtered_coefficients.pop("Double-pitch roof suction")
+    else:
+        filtered_coefficients.pop("Mono-pitch roof suction to up slope")
+        filtered_coefficients.pop("Mono-pitch roof suction to down slope")
+    return filtered_coefficients
+
+def calculate_allowed_peak_velocity_pressure(line_load_limits, pressure_coefficients: dict, bay_length) -> float:
+    """Calculate the largest peak velocity pressure which keeps line loads of all surfaces within their limits.
+        Rearranges p = cp ⋅ bay length [m] ⋅ qp into qp = p / (|cp| ⋅ bay length [m]) and takes the smallest value.
+        Surfaces without a limit, surfaces left out by the roof type and surfaces with zero coefficient do not limit the pressure.
+
+    Args:
+        line_load_limits (float | dict): Line load limit in kN/m for every surface, or a dictionary where key = name of the
+            pressure surface and value = line load limit. Limits are compared with the absolute values of the line loads.
+        pressure_coefficients (dict): Pressure coefficients, e.g. filtered with filter_pressure_coefficients.
+        bay_length (int): Bay length in millimeters. Single value or array.
+
+    Returns:
+        float: Allowed peak velocity pressure in kN/m2. Single value or array.
+
+    Raises:
+        ValueError: If a limit is given for an unknown pressure surface, e.g. a misspelled name.
+    """
+
+    if not isinstance(line_load_limits, dict):
+        line_load_limits = {key: line_load_limits for key in pressure_coefficients}
+    unknown_surfaces = [key for key in line_load_limits if key not in PRESSURE_SURFACES]
+    if unknown_surfaces:
+        raise ValueError(f"Unknown pressure surfaces in line load limits: {', '.join(map(str, unknown_surfaces))}")
+
+    allowed_pressure = np.inf
+    for key, limit in line_load_limits.items():
+        if key in pressure_coefficients:
+            line_load = np.abs(pressure_coefficients[key]) * np.asarray(bay_length, dtype=float) / 1000
+            limit, line_load = np.broadcast_arrays(np.asarray(limit, dtype=float), line_load)
+            surface_pressure = np.divide(limit, line_load, out=np.full(line_load.shape, np.inf), where=line_load > 0)
+            allowed_pressure = np.minimum(allowed_pressure, surface_pressure)
+    return allowed_pressure
+
+def calculate_max_bay_length(line_load_limits, pressure_coefficients: dict, peak_velocity_pressure) -> float:
+    """Calculate the largest bay length which keeps line loads of all surfaces within their limits.
+        Line loads are linear in bay length, so the limit is solved in closed form.
+
+    Args:
+        line_load_limits (float | dict): Line load limits in kN/m as in calculate_allowed_peak_velocity_pressure.
+        pressure_coefficients (dict): Pressure coefficients, e.g. filtered with filter_pressure_coefficients.
+        peak_velocity_pressure (float): Peak velocity pressure in kN/m2. Single value or array.
+
+    Returns:
+        float: Maximum bay length in millimeters. Single value or array.
+    """
+
+    allowed_pressure = calculate_allowed_peak_velocity_pressure(line_load_limits, pressure_coefficients, 1000)
+    return 1000 * allowed_pressure / np.asarray(peak_velocity_pressure, dtype=float)
+
+def calculate_max_height(
+    peak_velocity_pressure_limit,
+    fin,
+    terrain_category,
+    return_period,
+    fundamental_basic_wind_velocity,
+    seasonal_factor=1.0,
+    orography_factor=1.0,
+    air_density=1.25,
+    directional_factor=1.0,
+    turbulence_factor=1.0
+):
+    """Calculate the largest height where peak velocity pressure stays within the limit. With L = ln(z/z0)
+        peak velocity pressure is a quadratic of L:
+
+        qp = ρ / 2000 ⋅ (kr ⋅ c0 ⋅ vb)^2 ⋅ (L^2 + 7 ⋅ kl / c0 ⋅ L)
+
+        which is solved in closed form for the positive root. Heights below zmin use the pressure of zmin
+        and heights above 200 meters the pressure of 200 meters, as in calculate_peak_velocity_pressure.
+        All arguments can be single values or arrays, which are broadcast together.
+
+    Args:
+        peak_velocity_pressure_limit (float): Peak velocity pressure limit in kN/m2.
+        fin (bool): To determine whether finnish NA needs to be used or not.
+        terrain_category (int): Values between 0 - 4 to determine roughness and turbulence factors.
+        return_period (float): Return periods in years. Limited to min 2 years.
+        fundamental_basic_wind_velocity (float): Fundamental values of the basic wind velocity in m/s.
+        seasonal_factor (float, optional): The value of seasonal factor. Defaults to 1.0.
+        orography_factor (float, optional): Orography factor. Defaults to 1.0.
+        air_density (float, optional): Air density. Defaults to 1.25.
+        directional_factor (float, optional): The value of directional factor. Defaults to 1.0.
+        turbulence_factor (float, optional): The value of the turbulence factor. Defaults to 1.0.
+
+    Returns:
+        ndarray: Maximum heights in meters, limited to 200 meters. NaN if the limit is exceeded already at zmin.
+    """
+
+    if np is None:
+        raise ImportError("NumPy is required for array calculations")
+
+    terrain_category = np.asarray(terrain_category, dtype=int)
+    basic_wind_velocity = fundamental_basic_wind_velocity * calculate_propability_factor_array(return_period) * seasonal_factor * directional_factor
+    velocity_factor = calculate_terrain_factor_array(fin, terrain_category) * orography_factor * basic_wind_velocity
+    pressure_factor = 1/2000 * air_density * velocity_factor ** 2
+    linear_factor = 7 * turbulence_factor / orography_factor
+    log_height = (-linear_factor + np.sqrt(linear_factor ** 2 + 4 * peak_velocity_pressure_limit / pressure_factor)) / 2
+    max_height = np.asarray(Z_ZERO)[terrain_category] * np.exp(log_height)
+    return np.where(max_height < np.asarray(Z_MIN)[terrain_category], np.nan, np.minimum(max_height, 200))
+
+def calculate_max_return_period(
+    peak_velocity_pressure_limit,
+    fin,
+    terrain_category,
+    height,
+    fundamental_basic_wind_velocity,
+    seasonal_factor=1.0,
+    orography_factor=1.0,
+    air_density=1.25,
+    directional_factor=1.0,
+    turbulence_factor=1.0
+):
+    """Calculate the longest return period where peak velocity pressure stays within the limit. Peak velocity pressure
+        is proportional to cprob^2, so the allowed probability factor is solved from the pressure of 50 years return period
+        and converted into return period with calculate_return_period. All arguments can be single values or arrays.
+
+    Args:
+        peak_velocity_pressure_limit (float): Peak velocity pressure limit in kN/m2.
+        fin (bool): To determine whether finnish NA needs to be used or not.
+        terrain_category (int): Values between 0 - 4 to determine roughness and turbulence factors.
+        height (float): Heights from the ground in meters.
+        fundamental_basic_wind_velocity (float): Fundamental values of the basic wind velocity in m/s.
+        seasonal_factor (float, optional): The value of seasonal factor. Defaults to 1.0.
+        orography_factor (float, optional): Orography factor. Defaults to 1.0.
+        air_density (float, optional): Air density. Defaults to 1.25.
+        directional_factor (float, optional): The value of directional factor. Defaults to 1.0.
+        turbulence_factor (float, optional): The value of the turbulence factor. Defaults to 1.0.
+
+    Returns:
+        ndarray: Maximum return periods in years. NaN if the limit is exceeded already with 2 years return period.
+    """
+
+    reference = calculate_peak_velocity_pressure_array(
+        fin,
+        terrain_category,
+        50,
+        height,
+        fundamental_basic_wind_velocity,
+        seasonal_factor,
+        orography_factor,
+        air_density,
+        directional_factor,
+        turbulence_factor
+    )
+    cprob = reference["Probability factor"] * np.sqrt(peak_velocity_pressure_limit / reference["Peak velocity pressure"])
+    max_return_period = calculate_return_period(cprob)
+    return np.where(max_return_period < 2, np.nan, max_return_period)
+
 def add_basic_information(angle: int, bay_length: int, monopitch: bool, roof_width: int) -> str:
     """Format arguments and create multiline string of the basic information.
 
@@ -275,12 +934,7 @@ def add_pressure_coefficient_information(pressure_coefficients: dict, bay_length
 
     pressure_coefficient_info_header = "Pressure coefficients:\n"
     pressure_coefficient_info_params = ""
-    filtered_coefficients = pressure_coefficients.copy()
-    if (monopitch):
-        filtered_coefficients.pop("Double-pitch roof suction")
-    else:
-        filtered_coefficients.pop("Mono-pitch roof suction to up slope")
-        filtered_coefficients.pop("Mono-pitch roof suction to down slope")
+    filtered_coefficients = filter_pressure_coefficients(pressure_coefficients, monopitch)
 
     line_load = (bay_length / 1000) * peak_velocity_pressure
     for key, value in filtered_coefficients.items():
@@ -367,9 +1021,12 @@ def format_input(wind_calculation_params: list,
     height: float,
     imposed_load: float,
     consequence_class: int,
-    snow_load: float
+    snow_load: float,
+    lift_heights: list=None,
+    lift_line_loads: dict=None
 ) -> list:
     """Formats input with calculate parameters. These will be used as Revit parameters.
+        If lift heights and line loads per lift are given, line loads of every lift are added as well.
 
     Returns:
         list: List containing list with parameters names and other list with parameter values.
@@ -420,57 +1077,140 @@ def format_input(wind_calculation_params: list,
     for key, value in format_consequence_class(consequence_class).items():
         name_list.append(key)
         value_list.append(value)
+    if lift_heights is not None and lift_line_loads is not None:
+        for key, loads in lift_line_loads.items():
+            for lift_height, load in zip(lift_heights, loads):
+                name_list.append(f"{key} load at {lift_height:.1f} m")
+                value_list.append(f"{load:.2f}".replace(".", ","))
     return [name_list, value_list]
 
-# Input parameters recieved from the Revit / Dynamo user.
-finnish_na = IN[0] # boolen
-fundamental_basic_wind_velocity = IN[1] #in meters per second
-terrain_category = IN[2] #int value 0-4
-return_period = max(IN[3], 2) # in years. Min 2 years.
-seasonal_factor = IN[4]
-orography_factor = IN[5]
-height = IN[6] # in meters
-roof_width = IN[7] # in millimeters
-bay_length = IN[8] # in millimeters
-angle = IN[9] # in degrees
-monopitch = IN[10] # boolean
-imposed_load = IN[11] #in kilograms
-snow_load = IN[12] #in kilograms
-consequence_class = IN[13] #int value 1-3
-
-if roof_width == 0:
-    angle = 0
-
-wind_calculation_params = calculate_peak_velocity_pressure(
-    finnish_na,
-    terrain_category,
-    return_period, height,
-    fundamental_basic_wind_velocity,
-    seasonal_factor,
-    orography_factor
-)
-peak_velocity_pressure = wind_calculation_params[13]
-pressure_coefficients = calculate_pressure_coefficents(angle, roof_width)
-
-response_text = add_basic_information(angle, bay_length, monopitch, roof_width)
-response_text += "\n\n"
-response_text += add_wind_calculation_information(wind_calculation_params)
-response_text += "\n"
-response_text += add_pressure_coefficient_information(pressure_coefficients, bay_length, peak_velocity_pressure, monopitch)
-response_text += "\n"
-response_text += add_nominal_duration_information(return_period)
-
-TaskDialog.Show("Wind calculation results", response_text)
-
-OUT = format_input(
-    wind_calculation_params,
-    pressure_coefficients,
-    angle,
-    bay_length,
-    roof_width,
-    return_period,
-    height,
-    imposed_load,
-    consequence_class,
-    snow_load
-)
\ No newline at end of file
+if "IN" in globals() and len(IN) > 16 and IN[15] and IN[16]: # Dynamo batch mode, single site inputs are not used
+    OUT = calculate_site_batch(IN[15], IN[16])
+
+elif "IN" in globals(): # Dynamo node
+    import clr
+    clr.AddReference('RevitAPIUI')
+    from Autodesk.Revit.UI import TaskDialog
+
+    # Input parameters recieved from the Revit / Dynamo user.
+    finnish_na = IN[0] # boolen
+    fundamental_basic_wind_velocity = IN[1] #in meters per second
+    terrain_category = IN[2] #int value 0-4
+    return_period = max(IN[3], 2) # in years. Min 2 years.
+    seasonal_factor = IN[4]
+    orography_factor = IN[5]
+    height = IN[6] # in meters
+    roof_width = IN[7] # in millimeters
+    bay_length = IN[8] # in millimeters
+    angle = IN[9] # in degrees
+    monopitch = IN[10] # boolean
+    imposed_load = IN[11] #in kilograms
+    snow_load = IN[12] #in kilograms
+    consequence_class = IN[13] #int value 1-3
+    lift_spacing = IN[14] if len(IN) > 14 else None # Optional, in meters. Adds line loads for every lift.
+    design_table_path = IN[17] if len(IN) > 17 else None # Optional. Writes design table of all TC, heights, return periods and bay lengths.
+    line_load_limits = IN[18] if len(IN) > 18 else None # Optional, in kN/m. Single limit or dictionary of limits per surface.
+
+    if roof_width == 0:
+        angle = 0
+
+    wind_calculation_params = calculate_peak_velocity_pressure(
+        finnish_na,
+        terrain_category,
+        return_period, height,
+        fundamental_basic_wind_velocity,
+        seasonal_factor,
+        orography_factor
+    )
+    peak_velocity_pressure = wind_calculation_params[13]
+    pressure_coefficients = calculate_pressure_coefficents(angle, roof_width)
+
+    response_text = add_basic_information(angle, bay_length, monopitch, roof_width)
+    response_text += "\n\n"
+    response_text += add_wind_calculation_information(wind_calculation_params)
+    response_text += "\n"
+    response_text += add_pressure_coefficient_information(pressure_coefficients, bay_length, peak_velocity_pressure, monopitch)
+    response_text += "\n"
+    response_text += add_nominal_duration_information(return_period)
+
+    TaskDialog.Show("Wind calculation results", response_text)
+
+    lift_heights = None
+    lift_line_loads = None
+    if lift_spacing:
+        lift_heights = calculate_lift_heights(height, lift_spacing)
+        wind_profile = calculate_peak_velocity_pressure_profile(
+            finnish_na,
+            terrain_category,
+            return_period,
+            lift_heights,
+            fundamental_basic_wind_velocity,
+            seasonal_factor,
+            orography_factor
+        )
+        lift_line_loads = calculate_line_loads(pressure_coefficients, bay_length, wind_profile["Peak velocity pressure"])
+
+    OUT = format_input(
+        wind_calculation_params,
+        pressure_coefficients,
+        angle,
+        bay_length,
+        roof_width,
+        return_period,
+        height,
+        imposed_load,
+        consequence_class,
+        snow_load,
+        lift_heights,
+        lift_line_loads
+    )
+
+    extra_outputs = []
+    if design_table_path:
+        design_table = calculate_design_table(
+            finnish_na,
+            fundamental_basic_wind_velocity,
+            angle,
+            roof_width,
+            seasonal_factor=seasonal_factor,
+            orography_factor=orography_factor
+        )
+        extra_outputs.append(write_design_table(design_table, design_table_path))
+    if line_load_limits:
+        filtered_coefficients = filter_pressure_coefficients(pressure_coefficients, monopitch)
+        allowed_pressure = calculate_allowed_peak_velocity_pressure(line_load_limits, filtered_coefficients, bay_length)
+        max_values = {
+            "Max bay length": calculate_max_bay_length(line_load_limits, filtered_coefficients, peak_velocity_pressure),
+            "Max height": calculate_max_height(
+                allowed_pressure,
+                finnish_na,
+                terrain_category,
+                return_period,
+                fundamental_basic_wind_velocity,
+                seasonal_factor,
+                orography_factor
+            ),
+            "Max return period": calculate_max_return_period(
+                allowed_pressure,
+                finnish_na,
+                terrain_category,
+                height,
+                fundamental_basic_wind_velocity,
+                seasonal_factor,
+                orography_factor
+            )
+        }
+        extra_outputs.append({key: float(value) for key, value in max_values.items()})
+    if extra_outputs:
+        OUT = [OUT] + extra_outputs
+
+elif __name__ == "__main__": # Headless batch run, e.g. python calculate_load_information.py sites.csv results.csv
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Calculate wind loads for every site of a site CSV file.")
+    parser.add_argument("sites", help="Path of the site CSV file")
+    parser.add_argument("output", help="Path of the result CSV file")
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE, help="Sites calculated at once")
+    args = parser.parse_args()
+    site_count = calculate_site_batch(args.sites, args.output, args.chunk_size)
+    print(f"Calculated {site_count} sites: {args.output}")
@@ -1,8 +1,13 @@
+def create_path(default_path, project_info):
+    list_name = project_info[8][1]
+    project_name = project_info[3][1]
+    date = project_info[5][1]
+    return f"{default_path[:-13]}{list_name}  - {project_name} - {date}"
+
 default_path = IN[0]
 project_info = IN[1]
-list_name = project_info[8][1]
-project_name = project_info[3][1]
-date = project_info[5][1]
 
-new_path = f"{default_path[:-13]}{list_name}  - {project_name} - {date}"
-OUT = new_path
+if isinstance(project_info[0][0][0], list): # Language variants from information_service.py, one path per variant
+    OUT = [create_path(default_path, info[0]) for info in project_info]
+else:
+    OUT = create_path(default_path, project_info)
@@ -1,11 +1,32 @@
 import math
-import copy
-from itertools import compress
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import types
+import zlib
+from array import array
+from collections import deque
+from functools import reduce
+from itertools import compress, islice
 import clr
 clr.AddReference('RevitAPIUI')
 
 from Autodesk.Revit.UI import TaskDialog
 
+UNREACHABLE = 0xFFFF # Count stored for distances no bay combination can reach
+LONG_RUN_DISTANCE = 100000 # Distances (mm) from which the scaled bay table is used
+BAY_LENGTHS = [154, 390, 450, 732, 1088, 1400, 1572, 2072, 2572, 3072] # Bay catalogue in millimeters
+BAY_TABLE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "find_bay_combo")
+BAY_TABLE_CACHE_DISTANCE = LONG_RUN_DISTANCE # Cached tables are precomputed up to this distance (mm)
+BAY_TABLE_CACHE_FORMAT = 1 # Increase when the cache file layout changes
+BAY_TABLE_HEADER = struct.Struct("<4sII") # Magic, version key, filled limit
+SESSION_MODULE = "find_bay_combo_session" # Holds the bay solver between Dynamo runs
+MAX_BAY_COMBINATIONS = 50 # Default cap for listing every optimal bay combination
+PARETO_COUNT_SLACK = 2 # Pareto search keeps combinations with at most this many bays more than the least
+STOCK_IGNORED_NOTE = "Note: Bay stock is not limited in this mode. Results may use more bays than are in stock.\n\n"
+
 class BaySetup:
     def __init__(self, count=0):
         self.bay_count = count
@@ -37,42 +58,498 @@ class BaySetup:
         total_dist = self.check_sum()
         return f"Number of bays: {self.bay_count} - exact distance: {total_dist}"
 
-def find_least_bays(distance, tolerance, bay_lengths):
-    result = [BaySetup() for i in range(distance + tolerance + 1)]
+class BayTable:
+    """Minimum bay counts and backpointers for every distance from 0 up to the filled limit.
+        Only two compact arrays are kept: the least number of bays reaching each distance and
+        the last bay used to get there. BaySetup objects are rebuilt on demand by walking the
+        backpointers, so memory stays O(distance).
+    """
 
-    for i in range(1, distance + tolerance + 1):
-        bay_setup = result[i]
-        bay_setup.set_count(math.inf)
-        result[i] = bay_setup
+    def __init__(self, bay_lengths, counts=None, predecessors=None):
+        self.bay_lengths = bay_lengths
+        self.counts = array("H", [0]) if counts is None else counts
+        self.predecessors = array("H", [0]) if predecessors is None else predecessors
 
-        for bay in bay_lengths:
-            if bay <= i:
-                new_bay_setup = result[i - bay]
-                best_bay_setup = result[i]
-                new_bay_setup_count = new_bay_setup.get_count()
-                best_bay_setup_count = best_bay_setup.get_count()
-    
-                if new_bay_setup_count != math.inf and new_bay_setup_count + 1 < best_bay_setup_count:
-                    bay_copy = copy.deepcopy(new_bay_setup)
-                    bay_copy.add_bay(bay)
-                    result[i] = bay_copy
+    def get_limit(self):
+        return len(self.counts) - 1
+
+    def fill(self, limit):
+        if limit > self.get_limit() and not isinstance(self.counts, array): # Memory-mapped table, copy before extending
+            self.counts = array("H", self.counts)
+            self.predecessors = array("H", self.predecessors)
+        counts = self.counts
+        predecessors = self.predecessors
+        for i in range(len(counts), limit + 1):
+            best_count = UNREACHABLE
+            best_bay = 0
+            for bay in self.bay_lengths:
+                if bay <= i and counts[i - bay] + 1 < best_count:
+                    best_count = counts[i - bay] + 1
+                    best_bay = bay
+            counts.append(best_count)
+            predecessors.append(best_bay)
+
+    def get_count(self, distance):
+        count = self.counts[distance]
+        if count == UNREACHABLE:
+            return math.inf
+        return count
+
+    def get_bay_setup(self, distance):
+        bays = []
+        while distance > 0:
+            bay = self.predecessors[distance]
+            bays.append(bay)
+            distance -= bay
+
+        bay_setup = BaySetup()
+        for bay in reversed(bays):
+            bay_setup.add_bay(bay)
+        return bay_setup
+
+    def iter_bay_setups(self, distance):
+        """Lazily yield every distinct least-bay combination for the distance. Bay b is an optimal last
+            bay when count(distance - b) = count(distance) - 1, so the counts already describe the DAG of
+            optimal predecessors. Walking it with non-increasing bay lengths yields each multiset once.
+        """
+
+        bay_lengths = sorted(set(self.bay_lengths))
+        stack = [(distance, bay_lengths[-1] if bay_lengths else 0, ())]
+        while stack:
+            remaining, max_bay, bays = stack.pop()
+            if remaining == 0:
+                bay_setup = BaySetup()
+                for bay in bays:
+                    bay_setup.add_bay(bay)
+                yield bay_setup
+                continue
+
+            count = self.counts[remaining]
+            for bay in bay_lengths: # Largest bay ends up on top of the stack
+                if bay <= max_bay and bay <= remaining and self.counts[remaining - bay] + 1 == count:
+                    stack.append((remaining - bay, bay, bays + (bay,)))
+
+class LimitedBayTable:
+    """Bay table for limited stock, solved as a bounded knapsack minimising the number of bays.
+        Bay types are added one at a time. For a bay of length w available k times, the cells with
+        the same remainder modulo w form a sequence where
+
+        count(r + j ⋅ w) = j + min{ previous(r + i ⋅ w) - i : j - k <= i <= j }
+
+        and the sliding minimum is kept in a monotone deque, so each type costs O(distance) and the whole
+        table O(distance ⋅ number of types). The number of bays taken of each type is stored per cell
+        to rebuild the combinations.
+    """
+
+    def __init__(self, bay_lengths, bay_stock):
+        self.bay_types = [(bay, stock) for bay, stock in zip(bay_lengths, bay_stock) if stock is None or stock > 0]
+        self.counts = [0]
+        self.used = []
+
+    def get_limit(self):
+        return len(self.counts) - 1
+
+    def fill(self, limit):
+        if limit <= self.get_limit():
+            return
+        counts = [0] + [math.inf] * limit
+        self.used = []
+        for bay, stock in self.bay_types:
+            max_count = limit // bay if stock is None else stock
+            previous = counts
+            counts = previous.copy()
+            used = array("H", bytes(2 * (limit + 1)))
+            for remainder in range(min(bay, limit + 1)):
+                window = deque()
+                for j, cell in enumerate(range(remainder, limit + 1, bay)):
+                    value = previous[cell] - j
+                    while window and window[-1][1] >= value:
+                        window.pop()
+                    window.append((j, value))
+                    if window[0][0] < j - max_count:
+                        window.popleft()
+                    best_j, best_value = window[0]
+                    if best_value != math.inf:
+                        counts[cell] = best_value + j
+                        used[cell] = j - best_j
+            self.used.append(used)
+        self.counts = counts
+
+    def get_count(self, distance):
+        return self.counts[distance]
+
+    def get_bay_setup(self, distance):
+        bay_setup = BaySetup()
+        for (bay, stock), used in reversed(list(zip(self.bay_types, self.used))):
+            for _ in range(used[distance]):
+                bay_setup.add_bay(bay)
+            distance -= used[distance] * bay
+        return bay_setup
+
+def prune_dominated(labels):
+    """Keep only labels not dominated in (bay count, weight, price). Equal labels are kept once, which
+        also drops the other orderings of the same bay combination.
+    """
+
+    if len(labels) <= 1:
+        return labels
+    front = []
+    for label in sorted(labels):
+        if not any(kept[0] <= label[0] and kept[1] <= label[1] and kept[2] <= label[2] for kept in front):
+            front.append(label)
+    return front
+
+class ParetoBayTable:
+    """Pareto fronts of (bay count, total weight, total price) for every distance. Each cell holds the
+        non-dominated labels (count, weight, price, last bay, index of the parent label), which are pruned
+        while the table is filled. Labels with more than count_slack bays over the least count of their
+        distance are dropped, as they can only lead to labels over the slack later on. Weights are summed
+        in grams and prices in cents, so equal combinations compare equal.
+    """
+
+    def __init__(self, bay_lengths, bay_weights, bay_prices, count_slack=PARETO_COUNT_SLACK):
+        self.bay_items = [(bay, round(weight * 1000), round(price * 100)) for bay, weight, price in zip(bay_lengths, bay_weights, bay_prices)]
+        self.least = BayTable(bay_lengths)
+        self.count_slack = count_slack
+        self.labels = [[(0, 0, 0, 0, -1)]]
+
+    def fill(self, limit):
+        self.least.fill(limit)
+        labels = self.labels
+        for i in range(len(labels), limit + 1):
+            max_count = self.least.get_count(i) + self.count_slack
+            candidates = []
+            for bay, weight, price in self.bay_items:
+                if bay <= i:
+                    for index, (count, total_weight, total_price, _, _) in enumerate(labels[i - bay]):
+                        if count + 1 <= max_count:
+                            candidates.append((count + 1, total_weight + weight, total_price + price, bay, index))
+            labels.append(prune_dominated(candidates))
+
+    def get_bay_setup(self, distance, index):
+        bays = []
+        while distance > 0:
+            _, _, _, bay, index = self.labels[distance][index]
+            bays.append(bay)
+            distance -= bay
+
+        bay_setup = BaySetup()
+        for bay in reversed(bays):
+            bay_setup.add_bay(bay)
+        return bay_setup
+
+def get_bay_table_version():
+    """Version key stored in every cached bay table. Changes whenever the bay catalogue or the
+        cache file layout changes, which invalidates the old files.
+    """
+
+    return zlib.crc32(f"{BAY_TABLE_CACHE_FORMAT}:{BAY_LENGTHS}".encode())
+
+def get_bay_table_cache_path(bay_lengths):
+    """Cache file path for the filter mask matching the bay lengths. Returns None when the bay lengths
+        are not an ordered subset of the catalogue and therefore have no mask.
+    """
+
+    if bay_lengths != [bay for bay in BAY_LENGTHS if bay in bay_lengths]:
+        return None
+    mask = sum(1 << index for index, bay in enumerate(BAY_LENGTHS) if bay in bay_lengths)
+    return os.path.join(BAY_TABLE_CACHE_DIR, f"bay_table_{mask}.bin")
+
+def save_bay_table(table, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(BAY_TABLE_HEADER.pack(b"BAYT", get_bay_table_version(), table.get_limit()))
+        file.write(table.counts.tobytes())
+        file.write(table.predecessors.tobytes())
+    os.replace(temp_path, path)
+
+def load_bay_table(bay_lengths, path):
+    """Memory-map a cached bay table. Returns None if the file is missing, truncated or written
+        for another catalogue version.
+    """
+
+    try:
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mapped) < BAY_TABLE_HEADER.size:
+        return None
+    magic, version, limit = BAY_TABLE_HEADER.unpack_from(mapped)
+    array_size = 2 * (limit + 1)
+    if magic != b"BAYT" or version != get_bay_table_version() or len(mapped) != BAY_TABLE_HEADER.size + 2 * array_size:
+        return None
+
+    view = memoryview(mapped)[BAY_TABLE_HEADER.size:]
+    counts = view[:array_size].cast("H")
+    predecessors = view[array_size:].cast("H")
+    return BayTable(bay_lengths, counts, predecessors)
+
+def get_cached_bay_table(bay_lengths):
+    """Bay table for the bay lengths read from the on-disk cache. A missing or outdated cache file
+        is recomputed up to BAY_TABLE_CACHE_DISTANCE and written back. Returns None for bay lengths
+        that cannot be cached.
+    """
+
+    path = get_bay_table_cache_path(bay_lengths)
+    if path is None:
+        return None
+
+    table = load_bay_table(bay_lengths, path)
+    if table is None:
+        table = BayTable(bay_lengths)
+        table.fill(BAY_TABLE_CACHE_DISTANCE)
+        try:
+            save_bay_table(table, path)
+        except OSError: # Cache is only an optimisation, e.g. the file may be mapped by another Revit session
+            pass
+    return table
+
+class ScaledBayTable:
+    """Bay table for long runs. Distances are divided by the greatest common divisor of the bay
+        lengths, so only reachable distances get a cell. Filling stops as soon as the table has become
+        periodic with respect to the largest bay: once the relation
+
+        count(i) = count(i - largest) + 1
+
+        holds for a full largest bay worth of consecutive cells it holds for every longer distance too.
+        Longer distances are then answered greedily by adding largest bays until the residual falls
+        back inside the exact table.
+    """
+
+    def __init__(self, bay_lengths):
+        self.scale = reduce(math.gcd, bay_lengths)
+        self.largest = max(bay_lengths) // self.scale
+        self.table = BayTable([bay // self.scale for bay in bay_lengths])
+        self.periodic_from = None
+        self.periodic_run = 0
+
+    def fill(self, limit):
+        table = self.table
+        scaled_limit = limit // self.scale
+        while self.periodic_from is None and table.get_limit() < scaled_limit:
+            i = table.get_limit() + 1
+            table.fill(i)
+            if i >= self.largest and table.counts[i] == min(table.counts[i - self.largest] + 1, UNREACHABLE):
+                self.periodic_run += 1
+                if self.periodic_run == self.largest:
+                    self.periodic_from = i - self.largest + 1
+            else:
+                self.periodic_run = 0
+
+    def get_greedy_split(self, distance):
+        scaled_distance = distance // self.scale
+        limit = self.table.get_limit()
+        if scaled_distance <= limit:
+            return 0, scaled_distance
+        greedy_count = math.ceil((scaled_distance - limit) / self.largest)
+        return greedy_count, scaled_distance - greedy_count * self.largest
+
+    def get_count(self, distance):
+        if distance % self.scale != 0:
+            return math.inf
+        greedy_count, residual = self.get_greedy_split(distance)
+        return greedy_count + self.table.get_count(residual)
 
-    return sort_results(result, tolerance, distance)
+    def get_bay_setup(self, distance):
+        greedy_count, residual = self.get_greedy_split(distance)
+        bay_setup = BaySetup()
+        for bay in self.table.get_bay_setup(residual).get_bays():
+            bay_setup.add_bay(bay * self.scale)
+        for _ in range(greedy_count):
+            bay_setup.add_bay(self.largest * self.scale)
+        return bay_setup
 
-def sort_results(result, tolerance, distance):
-    best_results = []
+def create_bay_table(bay_lengths, scaled=False):
+    if scaled and bay_lengths:
+        return ScaledBayTable(bay_lengths)
+    return get_cached_bay_table(bay_lengths) or BayTable(bay_lengths)
+
+class BaySolver:
+    """Keeps bay tables between queries, one per bay length selection. Tables are only extended when
+        a longer distance than before is requested, shorter ones are answered from the existing cells.
+    """
+
+    def __init__(self):
+        self.version = get_bay_table_version()
+        self.tables = {}
+
+    def get_table(self, bay_lengths, scaled=False):
+        key = (tuple(bay_lengths), scaled and len(bay_lengths) > 0)
+        if key not in self.tables:
+            self.tables[key] = create_bay_table(bay_lengths, scaled)
+        return self.tables[key]
+
+def get_session_solver():
+    """Bay solver shared by every run in the same Dynamo session. Python modules outlive single script
+        runs, so the solver is stored on a module registered in sys.modules.
+    """
+
+    session = sys.modules.get(SESSION_MODULE)
+    if session is None:
+        session = types.ModuleType(SESSION_MODULE)
+        sys.modules[SESSION_MODULE] = session
+    solver = getattr(session, "solver", None)
+    if solver is None or solver.version != get_bay_table_version():
+        solver = BaySolver()
+        session.solver = solver
+    return solver
+
+def find_least_bays(distance, tolerance, bay_lengths, scaled=False, solver=None):
+    table = solver.get_table(bay_lengths, scaled) if solver else create_bay_table(bay_lengths, scaled)
+    table.fill(distance + tolerance)
+    return [table.get_bay_setup(search_dist) for search_dist in sort_results(table, tolerance, distance)]
+
+def find_least_bays_limited(distance, tolerance, bay_lengths, bay_stock):
+    """Find the least bays when only a limited number of each bay length is available.
+
+    Args:
+        distance (int): Targeted distance in millimeters.
+        tolerance (int): Allowed deviation from the targeted distance in millimeters.
+        bay_lengths (list): Bay lengths in use.
+        bay_stock (list): Available number of each bay length. None means unlimited.
+
+    Returns:
+        list: Best bay setups within the tolerance, same as find_least_bays.
+    """
+
+    table = LimitedBayTable(bay_lengths, bay_stock)
+    table.fill(distance + tolerance)
+    return [table.get_bay_setup(search_dist) for search_dist in sort_results(table, tolerance, distance)]
+
+def find_all_least_bays(distance, tolerance, bay_lengths, max_results=MAX_BAY_COMBINATIONS, solver=None):
+    """List every distinct least-bay combination at each best distance within the tolerance, instead of
+        one combination per distance. Combinations are generated lazily and at most max_results are returned.
+
+    Args:
+        distance (int): Targeted distance in millimeters.
+        tolerance (int): Allowed deviation from the targeted distance in millimeters.
+        bay_lengths (list): Bay lengths in use.
+        max_results (int, optional): Maximum number of combinations returned. Defaults to MAX_BAY_COMBINATIONS.
+        solver (BaySolver, optional): Solver whose tables are reused and extended. Defaults to None.
+
+    Returns:
+        list: Bay setups ordered by distance.
+    """
+
+    table = solver.get_table(bay_lengths) if solver else create_bay_table(bay_lengths)
+    table.fill(distance + tolerance)
+    results = []
+    for search_dist in sort_results(table, tolerance, distance):
+        results.extend(islice(table.iter_bay_setups(search_dist), max_results - len(results)))
+        if len(results) >= max_results:
+            break
+    return results
+
+def count_scaffold_components(bay_count, lift_count):
+    """Components of a scaffold frame with the given bays and lifts: standards for every lift at each of
+        the bay_count + 1 standard lines, and ledgers for every bay at each of the lift_count + 1 levels.
+    """
+
+    return (bay_count + 1) * lift_count + bay_count * (lift_count + 1)
+
+def find_scaffold_layouts(length, length_tolerance, height, height_tolerance, bay_lengths, lift_lengths, solver=None):
+    """Find scaffold layouts for a target length and height. Both directions are solved with the same
+        bay table core, bay lengths along the length and lift lengths along the height. Layouts are
+        ranked by total component count and then by total deviation from the targets.
+
+    Args:
+        length (int): Targeted scaffold length in millimeters.
+        length_tolerance (int): Allowed deviation from the targeted length in millimeters.
+        height (int): Targeted scaffold height in millimeters.
+        height_tolerance (int): Allowed deviation from the targeted height in millimeters.
+        bay_lengths (list): Bay lengths in use.
+        lift_lengths (list): Lift lengths in use.
+        solver (BaySolver, optional): Solver whose tables are reused and extended. Defaults to None.
+
+    Returns:
+        list: (bay setup, lift setup, component count) tuples, best layout first.
+    """
+
+    bay_setups = find_least_bays(length, length_tolerance, bay_lengths, solver=solver)
+    lift_setups = find_least_bays(height, height_tolerance, lift_lengths, solver=solver)
+    layouts = [
+        (bay_setup, lift_setup, count_scaffold_components(bay_setup.get_count(), lift_setup.get_count()))
+        for bay_setup in bay_setups
+        for lift_setup in lift_setups
+    ]
+    layouts.sort(key=lambda layout: (layout[2], abs(layout[0].check_sum() - length) + abs(layout[1].check_sum() - height)))
+    return layouts
+
+def find_pareto_bays(distance, tolerance, bay_lengths, bay_weights, bay_prices, count_slack=PARETO_COUNT_SLACK):
+    """Find the Pareto front of (bay count, total weight, total price) within the tolerance. Only
+        combinations with at most count_slack bays more than the least bay count are considered.
+
+    Args:
+        distance (int): Targeted distance in millimeters.
+        tolerance (int): Allowed deviation from the targeted distance in millimeters.
+        bay_lengths (list): Bay lengths in use.
+        bay_weights (list): Weight of each bay length in kilograms.
+        bay_prices (list): Price of each bay length.
+        count_slack (int, optional): Extra bays allowed over the least count. Defaults to PARETO_COUNT_SLACK.
+
+    Returns:
+        list: Non-dominated (bay setup, total weight, total price) tuples, ordered by bay count.
+    """
+
+    table = ParetoBayTable(bay_lengths, bay_weights, bay_prices, count_slack)
+    table.fill(distance + tolerance)
+    best_distances = sort_results(table.least, tolerance, distance)
+    if len(best_distances) == 0:
+        return []
+
+    max_count = table.least.get_count(best_distances[0]) + count_slack
+    labels = []
+    for search_dist in range(max(1, distance - tolerance), distance + tolerance + 1):
+        for index, label in enumerate(table.labels[search_dist]):
+            if label[0] <= max_count:
+                labels.append(label[:3] + (search_dist, index))
+
+    return [(table.get_bay_setup(search_dist, index), weight / 1000, price / 100) for _, weight, price, search_dist, index in prune_dominated(labels)]
+
+def find_least_bays_batch(segments, bay_lengths, scaled=False, solver=None):
+    """Solve many (distance, tolerance) segments with the same bay lengths. The bay table is filled
+        once up to the longest segment and every segment is answered from it.
+
+    Args:
+        segments (list): List of (distance, tolerance) pairs in millimeters.
+        bay_lengths (list): Bay lengths in use.
+        scaled (bool, optional): Use the GCD-scaled table meant for long runs. Defaults to False.
+        solver (BaySolver, optional): Solver whose tables are reused and extended. Defaults to None.
+
+    Returns:
+        list: One summary line per segment, in the same order as the segments.
+    """
+
+    table = solver.get_table(bay_lengths, scaled) if solver else create_bay_table(bay_lengths, scaled)
+    table.fill(max([distance + tolerance for distance, tolerance in segments], default=0))
+    summaries = []
+    for number, (distance, tolerance) in enumerate(segments, 1):
+        best_distances = sort_results(table, tolerance, distance)
+        if len(best_distances) == 0:
+            summaries.append(f"Segment {number} ({distance}): No bay combinations available")
+            continue
+        bay_setup = table.get_bay_setup(best_distances[0])
+        info = ', '.join(compact_bays(bay_setup.get_bays(), bay_lengths))
+        summaries.append(f"Segment {number} ({distance}): {bay_setup} - {info}")
+
+    return summaries
+
+def sort_results(table, tolerance, distance):
+    best_distances = []
     lowest_count = math.inf
     min_distance = max(0, distance - tolerance)
     for search_dist in range(min_distance, distance + tolerance + 1):
-        bay_setup = result[search_dist]
-        bay_setup_count = bay_setup.get_count()
+        bay_setup_count = table.get_count(search_dist)
         if bay_setup_count < lowest_count and bay_setup_count != 0:
-            best_results = [bay_setup]
+            best_distances = [search_dist]
             lowest_count = bay_setup_count
         elif bay_setup_count == lowest_count and bay_setup_count != math.inf:
-            best_results.append(bay_setup)
+            best_distances.append(search_dist)
     
-    return best_results
+    return best_distances
 
 def compact_bays(list_of_bays, bay_lengths):
     compacted_list = []
@@ -85,27 +562,86 @@ def compact_bays(list_of_bays, bay_lengths):
     return compacted_list
 
 bay_filters = IN[0]
-bay_lengths = [154, 390, 450, 732, 1088, 1400, 1572, 2072, 2572, 3072]
-filtered_bays = list(compress(bay_lengths, bay_filters))
+filtered_bays = list(compress(BAY_LENGTHS, bay_filters))
 distance = IN[1]
 tolerance = IN[2]
+bay_stock = IN[3] if len(IN) > 3 else None # Optional available count of each bay length, None = unlimited
+bay_weights = IN[4] if len(IN) > 4 else None # Optional weight of each bay length, enables Pareto ranking
+bay_prices = IN[5] if len(IN) > 5 else None # Optional price of each bay length, enables Pareto ranking
+max_combinations = IN[6] if len(IN) > 6 else None # Optional cap, lists every least-bay combination when given
+height = IN[7] if len(IN) > 7 else None # Optional scaffold height, enables the length x height layout
+height_tolerance = IN[8] if len(IN) > 8 else 0
+lift_lengths = IN[9] if len(IN) > 9 else []
+solver = get_session_solver()
+stock_ignored = bool(bay_stock) and bool(isinstance(distance, list) or height or (bay_weights and bay_prices) or max_combinations)
+stock_note = STOCK_IGNORED_NOTE if stock_ignored else ""
+
+if isinstance(distance, list): # Batch of façade segments. Tolerance can be shared or given per segment.
+    if not isinstance(tolerance, list):
+        tolerance = [tolerance] * len(distance)
+    segments = list(zip(distance, tolerance))
+    longest = max([dist + tol for dist, tol in segments], default=0)
+    summaries = find_least_bays_batch(segments, filtered_bays, longest >= LONG_RUN_DISTANCE, solver)
+    TaskDialog.Show("Dynamo Player", stock_note + '\n'.join(summaries))
+    OUT = summaries
 
-response_text = f"Targeted distance: {distance}\n\n"
+elif height: # Layout along the length and height
+    response_text = stock_note + f"Targeted length: {distance}\nTargeted height: {height}\n\n"
+    layouts = find_scaffold_layouts(distance, tolerance, height, height_tolerance, filtered_bays, lift_lengths, solver)
 
-results = find_least_bays(distance, tolerance, filtered_bays)
+    if len(layouts) == 0:
+        response_text += "No scaffold layouts available with current input"
+
+    counter = 1
+    for bay_setup, lift_setup, component_count in layouts[:MAX_BAY_COMBINATIONS]:
+        bay_info = ', '.join(compact_bays(bay_setup.get_bays(), filtered_bays))
+        lift_info = ', '.join(compact_bays(lift_setup.get_bays(), sorted(lift_lengths)))
+        response_text += f"Layout number {counter}: {component_count} components \n"
+        response_text += f"Bays: {bay_setup} - {bay_info} \n"
+        response_text += f"Lifts: Number of lifts: {lift_setup.get_count()} - exact height: {lift_setup.check_sum()} - {lift_info} \n\n"
+        counter += 1
 
-if len(results) == 0:
-    response_text += "No bay combinations available with current input"
     TaskDialog.Show("Dynamo Player", response_text)
+    OUT = "Success!"
+
+elif bay_weights and bay_prices: # Pareto ranking by bay count, weight and price
+    response_text = stock_note + f"Targeted distance: {distance}\n\n"
+    results = find_pareto_bays(distance, tolerance, filtered_bays, list(compress(bay_weights, bay_filters)), list(compress(bay_prices, bay_filters)))
+
+    if len(results) == 0:
+        response_text += "No bay combinations available with current input"
 
-else:
     counter = 1
-    for result in results:
+    for result, weight, price in results:
         info = ', '.join(compact_bays(result.get_bays(), filtered_bays))
-        response_text += f"Solution number {counter}: {result} \n"
+        response_text += f"Solution number {counter}: {result} - weight: {weight:.1f} kg - price: {price:.2f} € \n"
         response_text += f"Bay combination: {info} \n\n"
         counter += 1
 
     TaskDialog.Show("Dynamo Player", response_text)
+    OUT = "Success!"
+
+else:
+    response_text = stock_note + f"Targeted distance: {distance}\n\n"
+    if max_combinations:
+        results = find_all_least_bays(distance, tolerance, filtered_bays, max_combinations, solver)
+    elif bay_stock:
+        results = find_least_bays_limited(distance, tolerance, filtered_bays, list(compress(bay_stock, bay_filters)))
+    else:
+        results = find_least_bays(distance, tolerance, filtered_bays, distance + tolerance >= LONG_RUN_DISTANCE, solver)
+
+    if len(results) == 0:
+        response_text += "No bay combinations available with current input"
+        TaskDialog.Show("Dynamo Player", response_text)
+
+    else:
+        counter = 1
+        for result in results:
+            info = ', '.join(compact_bays(result.get_bays(), filtered_bays))
+            response_text += f"Solution number {counter}: {result} \n"
+            response_text += f"Bay combination: {info} \n\n"
+            counter += 1
+
+        TaskDialog.Show("Dynamo Player", response_text)
 
-OUT = "Success!"
\ No newline at end of file
+    OUT = "Success!"
\ No newline at end of file
@@ -1,6 +1,10 @@
+import sys
+import types
 from datetime import date
 from RevitServices.Persistence import DocumentManager as dm
-from Autodesk.Revit.DB import FilteredElementCollector, BuiltInCategory
+
+PROJECT_PARAMETERS = ["Author", "Client Name", "Project Address", "Project Name", "Supervisor name"]
+SESSION_MODULE = "information_service_session" # Holds project parameter indexes between Dynamo runs
 
 
 FIN = {"Author": "Suunnittelija",
@@ -61,7 +65,7 @@ LANGUAGES =[FIN, ENG, SWE]
 
 def get_main_language(input):
     index = input[3] - 1
-    primary_language = LANGUAGES[index]
+    primary_language = dict(LANGUAGES[index]) # Copy, so several variants can be built in one run
     product_names = []
     order = [input[3]]
     product_names.append(primary_language["Product names"][input[3]])
@@ -73,6 +77,20 @@ def get_main_language(input):
     primary_language["Key order"] = order
     return primary_language
 
+def get_language_variants(input, main_languages):
+    """Languages of every requested variant. Each variant uses the same language selection as the input,
+        only the main language changes.
+
+    Args:
+        input (list): Language selection (FIN, ENG, SWE booleans) and main language number.
+        main_languages (list): Main language numbers of the variants (1 = FIN, 2 = ENG, 3 = SWE).
+
+    Returns:
+        list: Language dictionaries in the same format as get_main_language.
+    """
+
+    return [get_main_language(list(input[:3]) + [number]) for number in main_languages]
+
 def convert_language(filtered_project_params, main_language):
     output = []
     for value in filtered_project_params:
@@ -86,24 +104,43 @@ def convert_language(filtered_project_params, main_language):
 
     return output
 
+def get_project_params(doc):
+    """Project information parameters of the document indexed by name. Parameters are looked up directly
+        by name from the project information element, and the index is cached per document for the
+        Dynamo session so repeated exports skip the lookup.
+
+    Args:
+        doc (Document): Revit document.
+
+    Returns:
+        dict: Key = parameter name. Value = parameter, or None if the document does not have it.
+    """
+
+    session = sys.modules.get(SESSION_MODULE)
+    if session is None:
+        session = types.ModuleType(SESSION_MODULE)
+        session.project_params = {}
+        sys.modules[SESSION_MODULE] = session
+
+    key = (doc.Title, doc.PathName)
+    cached = session.project_params.get(key)
+    if cached is None or not cached[0].IsValidObject:
+        project_information = doc.ProjectInformation
+        params = {name: project_information.LookupParameter(name) for name in PROJECT_PARAMETERS}
+        cached = (project_information, params)
+        session.project_params[key] = cached
+
+    return cached[1]
+
 def filter_project_info(project_params):
     result = []
-    for param in project_params:
-        result.append([param.Definition.Name, param.AsString()])
-    
-    author = result[6]
-    client_name = result[13]
-    address = result[14]
-    project_name = result[15]
-    supervisor = result[22]
-
-    # This is just to prevent getting erros with old Revit template due different param order.
-    if supervisor[0] != "Supervisor name":
-        supervisor = result[24]
+    for name in PROJECT_PARAMETERS:
+        param = project_params[name]
+        result.append([name, param.AsString() if param is not None else None])
 
-    datetime = ["Date", date.today()]
+    result.append(["Date", date.today()])
 
-    return [author, client_name, address, project_name, supervisor, datetime]
+    return result
 
 def get_headers(ml):
     names_length = len(ml["Product names"])
@@ -119,9 +156,16 @@ def get_headers(ml):
     
     return headers
 
-main_language = get_main_language(IN[0])
-project_params = FilteredElementCollector(dm.Instance.CurrentDBDocument).OfCategory(BuiltInCategory.OST_ProjectInformation).ToElements()[0].Parameters
+project_params = get_project_params(dm.Instance.CurrentDBDocument)
 filtered_project_params = filter_project_info(project_params)
-project_info = convert_language(filtered_project_params, main_language)
-headers = get_headers(main_language)
-OUT = [project_info, headers, main_language["Key order"]]
+main_languages = IN[1] if len(IN) > 1 else None # Optional main language numbers, one material list variant per language
+
+if main_languages:
+    OUT = []
+    for language in get_language_variants(IN[0], main_languages):
+        OUT.append([convert_language(filtered_project_params, language), get_headers(language), language["Key order"]])
+else:
+    main_language = get_main_language(IN[0])
+    project_info = convert_language(filtered_project_params, main_language)
+    headers = get_headers(main_language)
+    OUT = [project_info, headers, main_language["Key order"]]
@@ -1,6 +1,20 @@
+import csv
+import hashlib
+import operator
+import os
 import re
+import sqlite3
+import tempfile
+from array import array
+from itertools import repeat
 
-def create_project_info_and_headers(info, sums, notes):
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "material_list") # Master catalogue cache and export hashes
+MASTER_CACHE_FORMAT = "2" # Increase when the cache schema changes
+TARPAULIN_WEIGHT = 0.67 # kg/m2
+TARPAULIN_PRICE = 12.7 # €/m2
+TARPAULIN_ROLL_WIDTH = 2.572 # Standard tarpaulin width in meters, other widths are cut (KHTASAUS)
+
+def create_project_info_and_headers(info, sums, notes, project_sums=None):
 	info_list = []
 	project_info = info[0]
 	headers = info[1]
@@ -13,6 +27,11 @@ def create_project_info_and_headers(info, sums, notes):
 	info_list.append(f"{project_info[7][1]}: {sums[1]:.2f} €") # Put total price
 	info_list.append("")
 
+	if project_sums: # Put totals of each project of a consolidated list
+		for project_name, (weight, price) in project_sums.items():
+			info_list.append(f"{project_name}: {weight:.2f} kg | {price:.2f} €")
+		info_list.append("")
+
 	if len(notes_info) > 0: # Put additional notes according to certain criteria
 		for note in notes_info:
 			info_list.append(note)
@@ -41,7 +60,7 @@ def get_tarpaulin_parameters(length, width):
 	return tarpaulin_length, tarpaulin_width, tarpaulin_area
 
 def format_tarpaulin_product_number(product_number, length, width):
-	if width != 2.572:
+	if width != TARPAULIN_ROLL_WIDTH:
 		return "KHTASAUS"
 	return f"{product_number}{int(length)}"
 
@@ -60,34 +79,182 @@ def format_anchor_ledger_name(count, ledger_name):
 
     return formatted_name
 
-def combine_lists(project_list, master_list, info):
-	"""To be added...
+def format_product_number(product_number):
+	if isinstance(product_number, float) and product_number.is_integer(): # Numeric cells read from Excel
+		product_number = int(product_number)
+	return str(product_number).strip()
+
+def create_master_index(master_list):
+	"""Index master material list prices by product number. Prices are parsed once here instead of
+	on every schedule row. First row of the master list is headers. If a product number is listed
+	more than once, the first row is used. Product numbers are stored as text, so numeric cells match
+	the schedule, and rows without product number or price (e.g. formatted empty rows) are skipped.
 
 	Args:
-		project_list (list): Material list matrix from Revit Schedule. First row is header.
 		master_list (list): Master material list matrix. First row is headers.
-		info (list): Material list information. Contains 3 lists (1. Translated general info | 2. Translated headers | 3. Language order)
 
 	Returns:
-		list: Formated material, additional notes and total weight and price of all materials.
+		dict: Key = product number. Value = price as float.
 	"""
 
-	combined_list = []
-	key_order = info[2]
-	total_weight = 0
-	total_price = 0
-	notes = {}
+	master_index = {}
+	for master_product in master_list[1:]:
+		if len(master_product) < 6 or master_product[0] in (None, "") or master_product[5] in (None, ""):
+			continue
+		product_number = format_product_number(master_product[0])
+		if product_number:
+			master_index.setdefault(product_number, float(master_product[5]))
+
+	return master_index
+
+def read_master_workbook(path):
+	from openpyxl import load_workbook # Only needed when the catalogue cache is outdated
+
+	workbook = load_workbook(path, read_only=True, data_only=True)
+	master_list = [list(row) for row in workbook.worksheets[0].iter_rows(values_only=True)]
+	workbook.close()
+	return master_list
+
+def get_file_hash(path):
+	file_hash = hashlib.sha256()
+	with open(path, "rb") as file:
+		for chunk in iter(lambda: file.read(1 << 20), b""):
+			file_hash.update(chunk)
+	return file_hash.hexdigest()
+
+def load_master_index(path):
+	"""Master material list index read from a local SQLite cache of the master workbook. The cache
+	is rebuilt only when the workbook content has changed: a matching modification time is trusted
+	directly, otherwise the content hash decides.
+
+	Args:
+		path (str): Path of the master material list workbook.
+
+	Returns:
+		dict: Key = product number. Value = price as float.
+	"""
+
+	os.makedirs(CACHE_DIR, exist_ok=True)
+	cache_name = hashlib.sha1(os.path.abspath(path).lower().encode()).hexdigest()
+	connection = sqlite3.connect(os.path.join(CACHE_DIR, f"{cache_name}.sqlite"))
+	try:
+		with connection:
+			connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+			connection.execute("CREATE TABLE IF NOT EXISTS products (product_number PRIMARY KEY, price REAL)")
+		meta = dict(connection.execute("SELECT key, value FROM meta"))
+		modified = repr(os.path.getmtime(path))
+
+		if meta.get("format") != MASTER_CACHE_FORMAT or meta.get("modified") != modified:
+			content_hash = get_file_hash(path)
+			with connection:
+				if meta.get("format") != MASTER_CACHE_FORMAT or meta.get("hash") != content_hash:
+					master_index = create_master_index(read_master_workbook(path))
+					connection.execute("DELETE FROM products")
+					connection.executemany("INSERT INTO products VALUES (?, ?)", master_index.items())
+				connection.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+					("format", MASTER_CACHE_FORMAT),
+					("modified", modified),
+					("hash", content_hash)
+				])
+
+		return dict(connection.execute("SELECT product_number, price FROM products"))
+	finally:
+		connection.close()
+
+def aggregate_rows(project_list):
+	"""Merge schedule rows of the same product into one row by summing their counts. Revit schedules
+	often split a product on several rows by level or phase. Rows are keyed by product number, names,
+	unit weight and any extra columns (tarpaulin length and width), so custom products sharing a blank
+	product number and different tarpaulin sizes stay separate and total weight is unchanged. Suspended
+	notes are kept as they are, so the last one is used as before. Row order follows the first occurrence
+	of each product.
+
+	Args:
+		project_list (list): Material list matrix from Revit Schedule. First row is header.
+
+	Returns:
+		list: Aggregated product rows without the header row.
+	"""
+
+	aggregated = {}
+	for number, product in enumerate(project_list[1:]):
+		key = tuple(product[1:]) if product[1] != "SUSPENDED" else number
+		if key in aggregated:
+			row = aggregated[key]
+			count = int(row[0]) + int(product[0])
+			row[0] = str(count) if isinstance(row[0], str) else count
+		else:
+			aggregated[key] = list(product)
+
+	return list(aggregated.values())
+
+class MaterialTable:
+	"""Material rows held in typed columns: counts as integers, weights and prices as floats in
+	compact arrays, and product numbers and names as strings. Totals are summed column by column and
+	rows are converted into Dynamo lists only when the list is formated.
+	"""
+
+	def __init__(self):
+		self.counts = array("l")
+		self.product_numbers = []
+		self.weights = array("d")
+		self.prices = array("d")
+		self.names = ([], [], []) # FIN, ENG, SWE
+
+	def __len__(self):
+		return len(self.counts)
+
+	def append(self, count, product_number, weight, price, name_fin, name_eng, name_swe):
+		self.counts.append(int(count))
+		self.product_numbers.append(product_number)
+		self.weights.append(float(weight))
+		self.prices.append(float(price))
+		for names, name in zip(self.names, (name_fin, name_eng, name_swe)):
+			names.append(name)
+
+	def get_totals(self):
+		total_weight = sum(map(operator.mul, self.counts, self.weights))
+		total_price = sum(map(operator.mul, self.counts, self.prices))
+		return total_weight, total_price
+
+	def to_rows(self, key_order):
+		return [
+			sort_rows(key_order, list(row))
+			for row in zip(self.counts, self.product_numbers, self.weights, self.prices, *self.names)
+		]
+
+def combine_rows(project_list, master_list):
+	"""Combine schedule rows with master material list prices into a material table. Notes keep every
+	language, so one pass serves all language variants.
+
+	Args:
+		project_list (list): Material list matrix from Revit Schedule. First row is header.
+		master_list (list | str | dict): Master material list matrix, first row is headers. Or path of the master material list workbook, or index from create_master_index.
+
+	Returns:
+		list: Material table, note rows and total weight and price of all materials.
+	"""
+
+	table = MaterialTable()
+	unlisted_weight = 0
+	note_rows = {}
 	roof_system = False
+	if isinstance(master_list, dict): # Already indexed
+		master_index = master_list
+	elif isinstance(master_list, str):
+		master_index = load_master_index(master_list)
+	else:
+		master_index = create_master_index(master_list)
 
-	for product in project_list[1:]:
+	for product in aggregate_rows(project_list):
 		count = product[0]
 		product_number = product[1]
 		name_fin = product[2]
 		name_eng = product[3]
 		name_swe = product[4]
 		weight = float(product[5])
-		total_weight += weight * int(count)
 		found = False
+		listed = False # Row is in the material table with its schedule weight
 
 		if product_number == "KHKATT" and len(product) >= 8:
 			roof_system = True
@@ -95,48 +262,323 @@ def combine_lists(project_list, master_list, info):
 			edited_product_number = format_tarpaulin_product_number(product_number, tarpaulin_length, tarpaulin_width)
 			edited_name_fin, edited_name_eng, edited_name_swe = format_tarpaulin_names(name_fin, name_eng, name_swe, tarpaulin_length, tarpaulin_width)
 			
-			weight = round(tarpaulin_area * 0.67, 1)
-			price = round(tarpaulin_area * 12.7, 2)
-			total_weight += weight * int(count)
-			total_price += price * int(count)
-
-			row = [count, edited_product_number, weight, price, edited_name_fin, edited_name_eng, edited_name_swe]
-			sorted_row = sort_rows(key_order, row)
-			combined_list.append(sorted_row)
+			weight = round(tarpaulin_area * TARPAULIN_WEIGHT, 1)
+			price = round(tarpaulin_area * TARPAULIN_PRICE, 2)
+			note_rows.setdefault("Tarpaulins", []).append([int(count), tarpaulin_length, tarpaulin_width, weight, price])
+			table.append(count, edited_product_number, weight, price, edited_name_fin, edited_name_eng, edited_name_swe)
 			found = True # Do not add this row into material list
-		else:
-			for master_product in master_list[1:]:
-				m_product_number = master_product[0]
-				m_price = float(master_product[5])
-
-				if product_number == m_product_number:
-					row = [count, product_number, weight, m_price, name_fin, name_eng, name_swe]
-					sorted_row = sort_rows(key_order, row)
-					combined_list.append(sorted_row)
-					total_price += m_price * int(count)
-					found = True # Do not add this row into material list
-					break
+		elif format_product_number(product_number) in master_index:
+			m_price = master_index[format_product_number(product_number)]
+			table.append(count, product_number, weight, m_price, name_fin, name_eng, name_swe)
+			found = True # Do not add this row into material list
+			listed = True
 		
 		if product_number == "SUSPENDED":
-			notes["Suspended"] = product[key_order[0] + 1] # Language number + 1 to match correct column index
+			note_rows["Suspended"] = [name_fin, name_eng, name_swe]
 			found = True # Do not add this row into material list
 		
 		if product_number.startswith("AL"):
-			formatted_note = format_anchor_ledger_name(count, product[key_order[0] + 1])
-			notes.setdefault("Anchoring", []).append(formatted_note)
+			note_rows.setdefault("Anchoring", []).append([count, name_fin, name_eng, name_swe])
 			found = True # Do not add this row into material list
 
 		if not found:
-			row = [count, product_number, weight, '0', name_fin, name_eng, name_swe]
-			sorted_row = sort_rows(key_order, row)
-			combined_list.append(sorted_row)
+			table.append(count, product_number, weight, 0, name_fin, name_eng, name_swe)
+			listed = True
+
+		if not listed: # Notes and tarpaulins, their schedule weight still counts into the total weight
+			unlisted_weight += float(product[5]) * int(count)
 		
 	if roof_system:
-		row = ["0", "KHPÄÄT", "0", "0", "Muista lisätä päätypeitteet", "REMEMBER GABLE TARPAULINS", "Komma ihåg gavelduk"]
-		sorted_row = sort_rows(key_order, row)
-		combined_list.append(sorted_row)
+		table.append(0, "KHPÄÄT", 0, 0, "Muista lisätä päätypeitteet", "REMEMBER GABLE TARPAULINS", "Komma ihåg gavelduk")
 
-	return combined_list, notes, (total_weight, total_price)
+	total_weight, total_price = table.get_totals()
+	return table, note_rows, (total_weight + unlisted_weight, total_price)
+
+def create_notes(note_rows, key_order):
+	notes = {}
+	language = key_order[0] - 1 # Notes are written in the main language
+	if "Suspended" in note_rows:
+		notes["Suspended"] = note_rows["Suspended"][language]
+
+	for count, *names in note_rows.get("Anchoring", []):
+		notes.setdefault("Anchoring", []).append(format_anchor_ledger_name(count, names[language]))
+
+	return notes
+
+def format_rows(table, note_rows, info):
+	"""Convert the material table into ordered rows and notes for one language variant. Numeric columns
+	are shared by all variants, only the name columns are reordered.
+	"""
+
+	key_order = info[2]
+	return table.to_rows(key_order), create_notes(note_rows, key_order)
+
+def combine_lists(project_list, master_list, info):
+	"""Combine schedule rows with master material list prices and order them for the language of the info.
+
+	Args:
+		project_list (list): Material list matrix from Revit Schedule. First row is header.
+		master_list (list | str | dict): Master material list matrix, first row is headers. Or path of the master material list workbook, or index from create_master_index.
+		info (list): Material list information. Contains 3 lists (1. Translated general info | 2. Translated headers | 3. Language order)
+
+	Returns:
+		list: Formated material, additional notes and total weight and price of all materials.
+	"""
+
+	table, note_rows, sums = combine_rows(project_list, master_list)
+	combined_list, notes = format_rows(table, note_rows, info)
+	return combined_list, notes, sums
+
+def optimise_tarpaulin_cutting(tarpaulins, roll_width=TARPAULIN_ROLL_WIDTH, roll_length=None):
+	"""Plan how roof tarpaulins are cut from rolls of standard width to keep the offcut area small.
+	Sheets are packed into shelves across the roll width with first fit decreasing by length: every
+	shelf is as long as its first sheet and later sheets go into the first shelf with enough width left.
+	With a roll length, shelves are packed into rolls the same way. Sheets wider than the roll get a shelf
+	of their own and are counted with their own area.
+
+	Args:
+		tarpaulins (list): Tarpaulin rows [count, length, width, ...] with length and width in meters.
+		roll_width (float, optional): Roll width in meters. Defaults to TARPAULIN_ROLL_WIDTH.
+		roll_length (float, optional): Roll length in meters. Defaults to None (continuous roll).
+
+	Returns:
+		list: Cutting plan, weight and price of the consumed tarpaulin. Plan rows are
+		[roll number, shelf number, shelf length, used width, sheets as "width x length"].
+	"""
+
+	sheets = sorted(
+		((length, width) for count, length, width, *_ in tarpaulins for _ in range(count)),
+		reverse=True
+	)
+	shelves = [] # [length, used width, sheets]
+	consumed_area = 0
+	for length, width in sheets:
+		if width > roll_width:
+			shelves.append([length, width, [(length, width)]])
+			consumed_area += length * width
+			continue
+		for shelf in shelves:
+			if shelf[1] <= roll_width and shelf[1] + width <= roll_width + 1e-9:
+				shelf[1] += width
+				shelf[2].append((length, width))
+				break
+		else:
+			shelves.append([length, width, [(length, width)]])
+			consumed_area += length * roll_width
+
+	rolls = [] # Remaining length of each roll
+	plan = []
+	for number, (length, used_width, shelf_sheets) in enumerate(shelves, 1):
+		roll_number = 1
+		if roll_length:
+			for index, remaining in enumerate(rolls):
+				if length <= remaining + 1e-9:
+					rolls[index] -= length
+					roll_number = index + 1
+					break
+			else:
+				rolls.append(roll_length - length)
+				roll_number = len(rolls)
+		cuts = ", ".join(f"{width:.3f} x {length:.2f}" for length, width in shelf_sheets)
+		plan.append([roll_number, number, round(length, 3), round(used_width, 3), cuts])
+
+	return plan, round(consumed_area * TARPAULIN_WEIGHT, 1), round(consumed_area * TARPAULIN_PRICE, 2)
+
+def read_schedule_csv(path):
+	with open(path, newline="", encoding="utf-8-sig") as file:
+		return [row for row in csv.reader(file)]
+
+def combine_project(project_list, master_index):
+	if isinstance(project_list, str): # Schedule exported to CSV
+		project_list = read_schedule_csv(project_list)
+	return combine_rows(project_list, master_index)
+
+def merge_project_results(results):
+	"""Merge the material tables and note rows of several projects. Rows of the same product are merged
+	by summing their counts, so every project is combined with the master list only once.
+
+	Args:
+		results (list): Material table, note rows and totals of each project, as returned by combine_rows.
+
+	Returns:
+		list: Merged material table and note rows.
+	"""
+
+	counts = {}
+	anchoring = {}
+	tarpaulins = {}
+	note_rows = {}
+	roof_system = False
+	for table, project_note_rows, _ in results:
+		for count, *product in zip(table.counts, table.product_numbers, table.weights, table.prices, *table.names):
+			if product[0] == "KHPÄÄT": # Gable tarpaulin reminder is added once as the last row
+				roof_system = True
+				continue
+			counts[tuple(product)] = counts.get(tuple(product), 0) + count
+
+		if "Suspended" in project_note_rows:
+			note_rows["Suspended"] = project_note_rows["Suspended"]
+		for count, *names in project_note_rows.get("Anchoring", []):
+			anchoring[tuple(names)] = anchoring.get(tuple(names), 0) + int(count)
+		for count, *tarpaulin in project_note_rows.get("Tarpaulins", []):
+			tarpaulins[tuple(tarpaulin)] = tarpaulins.get(tuple(tarpaulin), 0) + count
+
+	if anchoring:
+		note_rows["Anchoring"] = [[count, *names] for names, count in anchoring.items()]
+	if tarpaulins:
+		note_rows["Tarpaulins"] = [[count, *tarpaulin] for tarpaulin, count in tarpaulins.items()]
+	table = MaterialTable()
+	for product, count in counts.items():
+		table.append(count, *product)
+	if roof_system:
+		table.append(0, "KHPÄÄT", 0, 0, "Muista lisätä päätypeitteet", "REMEMBER GABLE TARPAULINS", "Komma ihåg gavelduk")
+	return table, note_rows
+
+def consolidate_rows(project_lists, master_list, workers=1):
+	"""Combine material lists of several projects into one consolidated list. Each project can be a
+	schedule matrix or the path of a schedule exported to CSV. The master list is indexed only once
+	and shared by all projects. With more than one worker the projects are combined in a process pool,
+	which is only possible in headless runs, since Revit's embedded Python cannot start worker processes.
+
+	Args:
+		project_lists (list): Material list matrices from Revit Schedules or CSV paths. First row of each is header.
+		master_list (list | str): Master material list matrix, first row is headers. Or path of the master material list workbook.
+		workers (int, optional): Count of worker processes. Defaults to 1, which combines the projects in this process.
+
+	Returns:
+		list: Consolidated material table, note rows, grand total weight and price, and totals of each project.
+	"""
+
+	if isinstance(master_list, str):
+		master_index = load_master_index(master_list)
+	else:
+		master_index = create_master_index(master_list)
+
+	if workers > 1:
+		from concurrent.futures import ProcessPoolExecutor # Only used in headless runs
+
+		with ProcessPoolExecutor(max_workers=workers) as executor:
+			results = list(executor.map(combine_project, project_lists, repeat(master_index)))
+	else:
+		results = [combine_project(project_list, master_index) for project_list in project_lists]
+
+	project_sums = {}
+	for number, (project_list, (_, _, sums)) in enumerate(zip(project_lists, results), 1):
+		project_name = f"#{number}"
+		if isinstance(project_list, str):
+			project_name = os.path.splitext(os.path.basename(project_list))[0]
+		project_sums[project_name] = sums
+
+	table, note_rows = merge_project_results(results)
+	grand_sums = (sum(weight for weight, _ in project_sums.values()), sum(price for _, price in project_sums.values()))
+	return table, note_rows, grand_sums, project_sums
+
+def is_material_row(row):
+	"""Material rows have at least 5 cells and a numeric count, weight and price. Project info, notes and
+	headers of the node output are not material rows, so the whole previous output can be compared."""
+
+	if not isinstance(row, list) or len(row) < 5:
+		return False
+	try:
+		int(row[2])
+		float(row[3])
+		float(row[4])
+	except (TypeError, ValueError):
+		return False
+	return True
+
+def index_combined_list(combined_list):
+	index = {}
+	for row in filter(is_material_row, combined_list):
+		key = (row[0], row[1]) # Product number and main name, e.g. KHTASAUS rows differ only by name
+		count = int(row[2])
+		if key in index:
+			index[key][0] += count
+		else:
+			index[key] = [count, float(row[3]), float(row[4])]
+	return index
+
+def diff_combined_lists(old_list, new_list):
+	"""Compare material lists of two revisions. Rows are joined by product number and main name
+	through dictionaries, so the comparison stays linear in list size.
+
+	Args:
+		old_list (list): Formated material rows of the previous revision, as returned by combine_lists. The whole previous
+			node output can be given too, project info, notes and headers are skipped.
+		new_list (list): Formated material rows of the current revision, as returned by combine_lists.
+
+	Returns:
+		list: Changed rows [status, product number, name, old count, new count, count change, weight change, price change].
+		Status is "Added", "Removed" or "Changed".
+	"""
+
+	old_index = index_combined_list(old_list)
+	new_index = index_combined_list(new_list)
+	diff = []
+	for key, (new_count, weight, price) in new_index.items():
+		old_count = old_index[key][0] if key in old_index else 0
+		if new_count != old_count:
+			status = "Changed" if key in old_index else "Added"
+			change = new_count - old_count
+			diff.append([status, key[0], key[1], old_count, new_count, change, change * weight, change * price])
+
+	for key, (old_count, weight, price) in old_index.items():
+		if key not in new_index:
+			diff.append(["Removed", key[0], key[1], old_count, 0, -old_count, -old_count * weight, -old_count * price])
+
+	return diff
+
+def iter_export_rows(project_info, combined_list):
+	for info in project_info:
+		yield info if isinstance(info, list) else [info] # Headers are already a row, other info is a single cell
+	yield from combined_list
+
+def get_export_path(path):
+	if not path.lower().endswith(".xlsx"):
+		path += ".xlsx"
+	return path
+
+def get_content_hash(rows):
+	content_hash = hashlib.sha256()
+	for row in rows:
+		content_hash.update(repr(row).encode())
+		content_hash.update(b"\n")
+	return content_hash.hexdigest()
+
+def get_export_hash_path(path):
+	path_hash = hashlib.sha1(os.path.abspath(path).lower().encode()).hexdigest()
+	return os.path.join(CACHE_DIR, f"{path_hash}.export")
+
+def is_export_current(path, content_hash):
+	"""Check whether the workbook at the path was last exported with the same content."""
+
+	try:
+		with open(get_export_hash_path(path)) as file:
+			return os.path.exists(path) and file.read() == content_hash
+	except OSError:
+		return False
+
+def save_export_hash(path, content_hash):
+	os.makedirs(CACHE_DIR, exist_ok=True)
+	with open(get_export_hash_path(path), "w") as file:
+		file.write(content_hash)
+
+def export_material_list(path, rows):
+	"""Write material list rows into a new workbook in write-only mode, which streams rows into the file
+	instead of keeping the whole sheet in memory.
+
+	Args:
+		path (str): Output path of the workbook.
+		rows (iterable): Rows to write, e.g. from iter_export_rows.
+	"""
+
+	from openpyxl import Workbook # Only needed when exporting directly
+
+	workbook = Workbook(write_only=True)
+	worksheet = workbook.create_sheet()
+	for row in rows:
+		worksheet.append(row)
+	workbook.save(path)
 
 def sort_rows(key_order, row):
 	"""Raw row order:
@@ -167,6 +609,103 @@ def sort_rows(key_order, row):
 	
 	return sorted_row
 
-combined_list, notes, sums = combine_lists(IN[0], IN[1], IN[2])
-project_info = create_project_info_and_headers(IN[2], sums, notes)
-OUT = project_info + combined_list
+HEADLESS_HEADERS = ["Product number", "Name FIN", "Count", "Weight", "Price", "Name ENG", "Name SWE"] # Headers of the headless export
+HEADLESS_KEY_ORDER = [1, 2, 3] # FIN, ENG, SWE
+
+def export_consolidated_list(schedule_paths, master_path, export_path, workers=1):
+	"""Consolidate schedules exported to CSV and write the material list into a workbook without Revit or Dynamo.
+	The workbook starts with the grand totals and the totals of each project, followed by the material rows.
+
+	Args:
+		schedule_paths (list): Paths of the schedules exported to CSV.
+		master_path (str): Path of the master material list workbook.
+		export_path (str): Output path of the workbook.
+		workers (int, optional): Count of worker processes combining the schedules. Defaults to 1.
+
+	Returns:
+		str: Summary of the export.
+	"""
+
+	table, _, sums, project_sums = consolidate_rows(schedule_paths, master_path, workers)
+	export_path = get_export_path(export_path)
+	rows = [[f"Total weight: {sums[0]:.2f} kg"], [f"Total price: {sums[1]:.2f} €"], []]
+	rows += [[f"{project_name}: {weight:.2f} kg | {price:.2f} €"] for project_name, (weight, price) in project_sums.items()]
+	rows += [[], HEADLESS_HEADERS] + table.to_rows(HEADLESS_KEY_ORDER)
+	export_material_list(export_path, rows)
+	return f"Material list of {len(project_sums)} projects exported: {export_path}"
+
+def export_variant(project_info, combined_list, export_path):
+	export_path = get_export_path(export_path)
+	content_hash = get_content_hash(iter_export_rows(project_info, combined_list))
+	if is_export_current(export_path, content_hash): # Nothing changed since the last export, skip writing
+		return f"Material list is already up to date: {export_path}"
+
+	export_material_list(export_path, iter_export_rows(project_info, combined_list))
+	save_export_hash(export_path, content_hash)
+	return f"Material list exported: {export_path}"
+
+if "IN" in globals(): # Dynamo node
+	project_sums = None
+	if isinstance(IN[0][0], str) or isinstance(IN[0][0][0], list): # Several schedules or CSV paths, consolidated into one list
+		table, note_rows, sums, project_sums = consolidate_rows(IN[0], IN[1])
+	else:
+		table, note_rows, sums = combine_rows(IN[0], IN[1])
+
+	cutting_plan = None
+	optimise_tarpaulins = IN[5] if len(IN) > 5 else False # Optional, outputs a tarpaulin cutting plan with the consumed weight and price
+	if optimise_tarpaulins and "Tarpaulins" in note_rows:
+		tarpaulins = note_rows["Tarpaulins"]
+		plan, cut_weight, cut_price = optimise_tarpaulin_cutting(tarpaulins)
+		cutting_plan = { # Material list totals keep the per-sheet figures of the listed rows
+			"Cutting plan": plan,
+			"Sheet weight": round(sum(count * weight for count, _, _, weight, _ in tarpaulins), 1),
+			"Sheet price": round(sum(count * price for count, _, _, _, price in tarpaulins), 2),
+			"Consumed weight": cut_weight,
+			"Consumed price": cut_price
+		}
+
+	language_variants = isinstance(IN[2][0][0][0], list) # Info of several language variants from information_service.py
+	infos = IN[2] if language_variants else [IN[2]]
+	export_paths = IN[3] if len(IN) > 3 else None # Optional output path(s) from edit_path.py, writes the workbook directly
+	if not isinstance(export_paths, list):
+		if export_paths and language_variants and len(infos) > 1:
+			raise ValueError("Give one export path per language variant, e.g. the path list from edit_path.py")
+		export_paths = [export_paths] * len(infos)
+	elif len(export_paths) != len(infos):
+		raise ValueError(f"Got {len(export_paths)} export paths for {len(infos)} language variants")
+	elif len(set(map(get_export_path, export_paths))) != len(export_paths):
+		raise ValueError("Each language variant needs its own export path")
+
+	outputs = []
+	for info, export_path in zip(infos, export_paths):
+		combined_list, notes = format_rows(table, note_rows, info)
+		project_info = create_project_info_and_headers(info, sums, notes, project_sums)
+		if export_path:
+			outputs.append(export_variant(project_info, combined_list, export_path))
+		else:
+			outputs.append(project_info + combined_list)
+
+	OUT = outputs if language_variants else outputs[0]
+
+	extra_outputs = []
+	previous_revision = IN[4] if len(IN) > 4 else None # Optional material rows or whole output of the previous revision
+	if isinstance(previous_revision, str):
+		raise ValueError("Previous revision must be material rows, e.g. the earlier output of this node without export path")
+	if previous_revision:
+		combined_list, _ = format_rows(table, note_rows, infos[0])
+		extra_outputs.append(diff_combined_lists(previous_revision, combined_list))
+	if cutting_plan is not None:
+		extra_outputs.append(cutting_plan)
+	if extra_outputs:
+		OUT = [OUT] + extra_outputs
+
+elif __name__ == "__main__": # Headless batch run, e.g. python material_list.py master.xlsx output.xlsx a.csv b.csv
+	import argparse
+
+	parser = argparse.ArgumentParser(description="Consolidate schedule CSV files into one priced material list.")
+	parser.add_argument("master", help="Path of the master material list workbook")
+	parser.add_argument("output", help="Path of the output workbook")
+	parser.add_argument("schedules", nargs="+", help="Paths of the schedules exported to CSV")
+	parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes, defaults to the CPU count")
+	args = parser.parse_args()
+	print(export_consolidated_list(args.schedules, args.master, args.output, args.workers))